@@ -0,0 +1,142 @@
+"""
+Runs auto_parse_table over the generated corpus in tests/autoreader_corpus.py and records per case
+the sniff time (encoding detection and parameter scoring of the head), the full read time and the
+detected parameters compared to the generated ones.
+
+Usage: python benchmarks/bench_autoreader.py [--mixed N] [--repeats N] [--output results.json]
+                                            [--check [thresholds.json]]
+
+With --check the summary is compared to benchmarks/autoreader_thresholds.json (or the given file)
+and the script exits with 1 if a threshold is exceeded. Timings depend on the machine, adjust the
+thresholds locally before comparing changes.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from io import BytesIO
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+
+from autoreader_corpus import generate_corpus, parameter_errors  # noqa: E402
+from funcnodes_pandas.dataframe._autoreader import (  # noqa: E402
+    ENCODING_BYTE_BUDGET,
+    _read_head_lines,
+    _sniff_and_read,
+    auto_parse_table,
+)
+
+DEFAULT_THRESHOLDS = os.path.join(
+    os.path.dirname(__file__), "autoreader_thresholds.json"
+)
+
+
+def sniff(data: bytes, max_lines: int = 200):
+    """The detection part of auto_parse_table, without reading the table."""
+    _, _, _, _, text = _read_head_lines(BytesIO(data), ENCODING_BYTE_BUDGET, max_lines)
+    return _sniff_and_read(
+        text.split("\n"),
+        lambda params: None,
+        possible_delimiters=None,
+        possible_decimal_separators=None,
+        possible_thousands_separators=None,
+        max_lines=max_lines,
+        cutoff_ratio=0.5,
+        workers=1,
+        use_cache=False,
+    )[1]
+
+
+def best_time(func, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(mixed: int, repeats: int) -> dict:
+    results = []
+    for case in generate_corpus(mixed=mixed):
+        data = case.data()
+        try:
+            df, params = auto_parse_table(data, use_cache=False)
+            errors = parameter_errors(case, df, params)
+        except ValueError as e:
+            errors = [f"failed: {e}"]
+        results.append(
+            {
+                "case": case.name,
+                "bytes": len(data),
+                "sniff_ms": best_time(lambda: sniff(data), repeats) * 1000,
+                "full_read_ms": best_time(
+                    lambda: auto_parse_table(data, use_cache=False), repeats
+                )
+                * 1000,
+                "errors": errors,
+            }
+        )
+    summary = {
+        "cases": len(results),
+        "accuracy": float(np.mean([not r["errors"] for r in results])),
+        "median_sniff_ms": float(np.median([r["sniff_ms"] for r in results])),
+        "max_sniff_ms": float(np.max([r["sniff_ms"] for r in results])),
+        "total_full_read_ms": float(np.sum([r["full_read_ms"] for r in results])),
+    }
+    return {"summary": summary, "results": results}
+
+
+def check(summary: dict, thresholds: dict) -> list:
+    failures = []
+    if summary["accuracy"] < thresholds["min_accuracy"]:
+        failures.append(
+            f"accuracy {summary['accuracy']:.3f} < {thresholds['min_accuracy']}"
+        )
+    for key in ("median_sniff_ms", "max_sniff_ms", "total_full_read_ms"):
+        if summary[key] > thresholds[key]:
+            failures.append(f"{key} {summary[key]:.1f} > {thresholds[key]}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mixed", type=int, default=24, help="random mixed cases")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", help="write the per case results as json")
+    parser.add_argument(
+        "--check", nargs="?", const=DEFAULT_THRESHOLDS, metavar="THRESHOLDS"
+    )
+    args = parser.parse_args()
+
+    report = run(args.mixed, args.repeats)
+    for result in report["results"]:
+        status = "ok" if not result["errors"] else "; ".join(result["errors"])
+        print(
+            f"{result['case']:<80} sniff {result['sniff_ms']:7.1f} ms"
+            f"  read {result['full_read_ms']:8.1f} ms  {status}"
+        )
+    summary = report["summary"]
+    print(
+        f"{summary['cases']} cases, accuracy {summary['accuracy']:.3f}, sniff median "
+        f"{summary['median_sniff_ms']:.1f} ms / max {summary['max_sniff_ms']:.1f} ms, "
+        f"read total {summary['total_full_read_ms']:.0f} ms"
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.check:
+        with open(args.check) as f:
+            failures = check(summary, json.load(f))
+        for failure in failures:
+            print(f"threshold exceeded: {failure}")
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Compares serial and process pool sniffing of auto_parse_table on 200 line samples with wide rows.
+
+Usage: python benchmarks/bench_autoreader_parallel.py [columns] [repeats]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from funcnodes_pandas.dataframe._autoreader import (
+    auto_parse_table,
+    available_cores,
+    score_table_info,
+)
+
+
+def make_csv(columns: int, rows: int = 200, seed: int = 0) -> str:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        rng.normal(scale=1000, size=(rows, columns)),
+        columns=[f"col{i}" for i in range(columns)],
+    )
+    df["label"] = rng.choice(["a", "b", "c"], rows)
+    return "name: benchmark\n" + df.to_csv(index=False, sep=";", decimal=",")
+
+
+def timeit(func, repeats: int) -> float:
+    func()  # warm up, e.g. starting the process pool
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats
+
+
+def main(columns: int = 200, repeats: int = 5):
+    text = make_csv(columns)
+    workers = available_cores()
+    print(f"200 lines x {columns} columns, {workers} cores")
+
+    serial_df, serial_params = auto_parse_table(text, workers=1, use_cache=False)
+    parallel_df, parallel_params = auto_parse_table(text, workers=0, use_cache=False)
+    assert serial_params == parallel_params
+    pd.testing.assert_frame_equal(serial_df, parallel_df)
+
+    lines = text.split("\n")[:200]
+    args = (
+        lines,
+        [",", "\t", "\\t", " " * 4, " " * 3, " " * 2, " ", ";", "|"],
+        [".", ",", None],
+        [None, ",", ".", " "],
+    )
+    for label, kwargs in [
+        ("sniffing, pruned", {"cutoff_ratio": 0.5}),
+        ("sniffing, all candidates", {}),
+    ]:
+        serial = timeit(lambda: score_table_info(*args, workers=1, **kwargs), repeats)
+        parallel = timeit(lambda: score_table_info(*args, workers=0, **kwargs), repeats)
+        print(
+            f"{label:<26} serial {serial * 1000:8.1f} ms"
+            f"  parallel {parallel * 1000:8.1f} ms  speedup {serial / parallel:4.2f}x"
+        )
+
+    serial = timeit(lambda: auto_parse_table(text, workers=1, use_cache=False), repeats)
+    parallel = timeit(
+        lambda: auto_parse_table(text, workers=0, use_cache=False), repeats
+    )
+    print(
+        f"{'auto_parse_table':<26} serial {serial * 1000:8.1f} ms"
+        f"  parallel {parallel * 1000:8.1f} ms  speedup {serial / parallel:4.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:3]))
@@ -11,6 +11,13 @@ from .dataframe import (
     from_dict,
     from_csv_str,
     from_csv_auto,
+    from_csv_archive,
+    SNIFF_CACHE,
+    SniffCache,
+    iter_parse_table,
+    WORKBOOK_CACHE,
+    WorkbookCache,
+    excel_sheet_names,
     GetColumnNode as get_column,
     SetColumnNode as set_column,
     to_orient_dict,
@@ -24,6 +31,11 @@ from .dataframe import (
     df_from_array,
     DfFromExcelNode,
     df_to_xls,
+    df_from_parquet,
+    df_to_parquet,
+    df_from_feather,
+    df_to_feather,
+    iter_parquet_batches,
     dropna,
     ffill,
     bfill,
@@ -114,25 +126,34 @@ from .grouping import (
     NODE_SHELF as GROUPING_SHELF,
 )
 
+from .encoding import (
+    cached_encoding,
+    encoding_cache_stats,
+    ENCODING_CACHE,
+    encoding_options,
+    get_encoding_options,
+    df_to_arrow_ipc,
+    arrow_ipc_to_df,
+    df_window,
+    encode_window,
+    encode_io_value,
+    iter_encode_dataframe,
+    df_summary_stats,
+)
+
 
 def encode_pdDf(obj, preview=False):
     if isinstance(obj, pd.DataFrame):
-        if preview:
-            return fn.Encdata(
-                obj.head().to_dict(orient="split"),
-                handeled=True,
-                continue_preview=False,
-            )
-        else:
-            return fn.Encdata(
-                obj.to_dict(orient="split"),
-                handeled=True,
-                continue_preview=False,
-            )
+        return fn.Encdata(
+            cached_encoding(obj, "table", preview=preview),
+            handeled=True,
+            done=True,
+        )
     if isinstance(obj, pd.Series):
         return fn.Encdata(
-            obj.values,
+            cached_encoding(obj, "list", preview=preview),
             handeled=True,
+            done=True,
         )
     return fn.Encdata(obj, handeled=False)
 
@@ -163,6 +184,13 @@ __all__ = [
     "from_dict",
     "from_csv_str",
     "from_csv_auto",
+    "from_csv_archive",
+    "SNIFF_CACHE",
+    "SniffCache",
+    "iter_parse_table",
+    "WORKBOOK_CACHE",
+    "WorkbookCache",
+    "excel_sheet_names",
     "get_column",
     "to_orient_dict",
     "from_orient_dict",
@@ -181,6 +209,11 @@ __all__ = [
     "df_from_array",
     "DfFromExcelNode",
     "df_to_xls",
+    "df_from_parquet",
+    "df_to_parquet",
+    "df_from_feather",
+    "df_to_feather",
+    "iter_parquet_batches",
     "dropna",
     "ffill",
     "bfill",
@@ -273,4 +306,18 @@ __all__ = [
     "group_by_column",
     "get_df_from_group",
     # end grouping
+    # encoding
+    "encode_pdDf",
+    "encoding_options",
+    "get_encoding_options",
+    "df_to_arrow_ipc",
+    "arrow_ipc_to_df",
+    "df_window",
+    "encode_window",
+    "encode_io_value",
+    "iter_encode_dataframe",
+    "df_summary_stats",
+    "encoding_cache_stats",
+    "ENCODING_CACHE",
+    # end encoding
 ]
@@ -6,15 +6,31 @@ from ._convert import (  # noqa: F401
     from_dict,
     from_csv_str,
     from_csv_auto,
+    from_csv_archive,
     to_csv_str,
     to_orient_dict,
     from_orient_dict,
     df_from_array,
     DfFromExcelNode,
     df_to_xls,
+    df_from_parquet,
+    df_to_parquet,
+    df_from_feather,
+    df_to_feather,
+    iter_parquet_batches,
     CONVERT_SHELF,
     pd,
 )
+from ._autoreader import (  # noqa: F401
+    SNIFF_CACHE,
+    SniffCache,
+    iter_parse_table,
+)
+from ._excelreader import (  # noqa: F401
+    WORKBOOK_CACHE,
+    WorkbookCache,
+    excel_sheet_names,
+)
 from ._manipulation import (  # noqa: F401
     dropna,
     fillna,
@@ -1,26 +1,255 @@
-from typing import List, Union, Dict, Any, Tuple
-import chardet
+from typing import (
+    List,
+    Union,
+    Dict,
+    Any,
+    Tuple,
+    Optional,
+    BinaryIO,
+    Callable,
+    ContextManager,
+    Iterator,
+)
+from collections import OrderedDict
+import bz2
+import codecs
+import contextlib
+import csv
+import errno
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import mmap
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from chardet.universaldetector import UniversalDetector
 import pandas as pd
-from io import StringIO
+from io import StringIO, BytesIO
 import numpy as np
 
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover
+    pa = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+# region encoding
+
+# bytes fed to the detector at once and the maximal number of bytes inspected
+ENCODING_CHUNK_SIZE = 64 * 1024
+ENCODING_BYTE_BUDGET = 1024 * 1024
+
+# byte order marks, utf-32 has to be checked before utf-16 since they share a prefix
+BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+def detect_encoding_info(
+    data: Union[bytes, BinaryIO],
+    chunk_size: int = ENCODING_CHUNK_SIZE,
+    max_bytes: Optional[int] = ENCODING_BYTE_BUDGET,
+) -> Dict[str, Any]:
+    """
+    Detects the encoding of bytes or a binary stream from a bounded sample. The data is fed to
+    chardet in chunks until the detector is confident or max_bytes are read (None for no limit),
+    byte order marks are resolved without running the detector.
+    Returns a dict with "encoding", "confidence", the number of inspected "bytes" and if the
+    whole input was inspected ("complete"). Streams are read from their current position and
+    are not rewound.
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        stream = io.BytesIO(data)
+    else:
+        stream = data
+
+    head = stream.read(4)
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return {
+                "encoding": encoding,
+                "confidence": 1.0,
+                "bytes": len(head),
+                "complete": False,
+            }
+
+    detector = UniversalDetector()
+    detector.feed(head)
+    read = len(head)
+    complete = False
+    while not complete and not detector.done:
+        size = chunk_size
+        if max_bytes is not None:
+            size = min(size, max_bytes - read)
+            if size <= 0:
+                break
+        chunk = stream.read(size)
+        if not chunk:
+            complete = True
+            break
+        detector.feed(chunk)
+        read += len(chunk)
+    detector.close()
+
+    encoding = detector.result["encoding"]
+    confidence = float(detector.result["confidence"] or 0.0)
+    if encoding is None:
+        # empty or undecidable input
+        encoding, confidence = "utf-8", 0.0
+    elif encoding == "ascii" and not complete:
+        # the unread rest may contain non ascii characters, utf-8 is the compatible superset
+        encoding = "utf-8"
+    return {
+        "encoding": encoding,
+        "confidence": confidence,
+        "bytes": read,
+        "complete": complete,
+    }
+
 
 def detect_encoding(bytes):
     """Detect file encoding using chardet."""
-    result = chardet.detect(bytes)
-    return result["encoding"]
+    return detect_encoding_info(bytes)["encoding"]
+
+
+def decode_bytes(
+    data: bytes, max_bytes: Optional[int] = ENCODING_BYTE_BUDGET
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Decodes bytes with the encoding detected from a bounded sample. If the sample was
+    misleading and decoding fails, the encoding is detected again on the complete data.
+    Returns the text and the detection info of detect_encoding_info.
+    """
+    info = detect_encoding_info(data, max_bytes=max_bytes)
+    try:
+        return data.decode(info["encoding"]), info
+    except UnicodeDecodeError:
+        if info["complete"] or max_bytes is None:
+            raise
+    info = detect_encoding_info(data, max_bytes=None)
+    return data.decode(info["encoding"]), info
 
 
 def get_lines(file: str):
     with open(file, "rb") as rawdata:
-        data = rawdata.read()
+        encoding = detect_encoding_info(rawdata)["encoding"]
+        rawdata.seek(0)
+        # decode the already opened file instead of reading it a second time
+        with io.TextIOWrapper(rawdata, encoding=encoding, errors="replace") as f:
+            lines = f.readlines()
 
-    encoding = detect_encoding(data)
+    return lines, encoding
 
-    with open(file, "r", encoding=encoding, errors="replace") as f:
-        lines = f.readlines()
 
-    return lines, encoding
+# endregion encoding
+
+
+# region compression
+
+# magic bytes at the start of compressed sources, an empty zip archive starts with its end record
+COMPRESSION_MAGIC = [
+    (b"\x1f\x8b", "gzip"),
+    (b"PK\x03\x04", "zip"),
+    (b"PK\x05\x06", "zip"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+]
+# bz2 streams start with "BZh", the block size digit and the block magic
+BZ2_MAGIC = re.compile(rb"BZh[1-9]1AY&SY")
+COMPRESSION_MAGIC_SIZE = 10
+
+
+def detect_compression(head: bytes) -> Optional[str]:
+    """The compression ("gzip", "zip", "bz2", "xz" or "zstd") of a source starting with head."""
+    for magic, compression in COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return compression
+    if BZ2_MAGIC.match(head):
+        return "bz2"
+    return None
+
+
+def _peek(stream: Any, size: int) -> bytes:
+    """The first bytes of a binary stream without consuming them, b"" if that is not possible."""
+    if isinstance(stream, io.TextIOBase):
+        return b""
+    if stream.seekable():
+        position = stream.tell()
+        head = stream.read(size)
+        stream.seek(position)
+        return head
+    if hasattr(stream, "peek"):
+        return stream.peek(size)[:size]
+    return b""
+
+
+def source_compression(source: Any) -> Optional[str]:
+    """The compression of a CSV source (bytes-like buffer, path or binary stream), if any."""
+    if isinstance(source, str):
+        return None
+    if isinstance(source, os.PathLike):
+        with open(source, "rb") as f:
+            return detect_compression(f.read(COMPRESSION_MAGIC_SIZE))
+    if hasattr(source, "read"):
+        return detect_compression(_peek(source, COMPRESSION_MAGIC_SIZE))
+    return detect_compression(bytes(source[:COMPRESSION_MAGIC_SIZE]))
+
+
+def zip_members(archive: zipfile.ZipFile) -> List[str]:
+    """The file members of a zip archive, without directories and macOS resource forks."""
+    return [
+        info.filename
+        for info in archive.infolist()
+        if not info.is_dir() and not info.filename.startswith("__MACOSX/")
+    ]
+
+
+def open_decompressed(
+    stream: BinaryIO, compression: str, member: Optional[str] = None
+) -> BinaryIO:
+    """
+    Binary stream decompressing stream while it is read. Zip archives have to contain a single
+    file, unless the member is given. Closing the returned stream leaves stream open.
+    """
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=stream, mode="rb")
+    if compression == "bz2":
+        return bz2.BZ2File(stream)
+    if compression == "xz":
+        return lzma.LZMAFile(stream)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd compressed sources require the zstandard package")
+        return zstandard.ZstdDecompressor().stream_reader(stream, closefd=False)
+    if compression == "zip":
+        archive = zipfile.ZipFile(stream)
+        if member is None:
+            members = zip_members(archive)
+            if len(members) != 1:
+                raise ValueError(
+                    f"zip archive with {len(members)} members, select one of {members}"
+                )
+            member = members[0]
+        return archive.open(member)
+    raise ValueError(f"unknown compression {compression}")
+
+
+# endregion compression
 
 
 def guess_table_info(
@@ -29,35 +258,305 @@ def guess_table_info(
     possible_decimal_separators,
     possible_thousands_separators,
 ):
-    lineinfo = {
-        "length": len(line),
+    """Value kinds of a single line for all parameter combinations, see score_table_info."""
+    return score_table_info(
+        [line],
+        possible_delimiters=possible_delimiters,
+        possible_decimal_separators=possible_decimal_separators,
+        possible_thousands_separators=possible_thousands_separators,
+    )[0]
+
+
+# region scoring
+
+# the type of a single parsed value, as inferred by pd.read_csv
+KIND_INT = 0  # int64
+KIND_FLOAT = 1  # float64, including missing values
+KIND_OTHER = 2  # everything else, e.g. object, bool or uint64
+
+# the default na_values of pd.read_csv
+NA_VALUES = {
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+}
+
+# whitespace that is skipped around numbers when converting values
+_WS = r"[ \t\n\v\f\r]*"
+_INT_RE = re.compile(_WS + r"[+-]?[0-9]+" + _WS)
+_FLOAT_RE = re.compile(
+    _WS + r"[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?" + _WS
+)
+_INF_RE = re.compile(r"[+-]?(?:infinity|inf)", re.IGNORECASE)
+
+_INT64_MAX = np.iinfo(np.int64).max
+_INT64_MIN = np.iinfo(np.int64).min
+
+
+class _PythonEngineDialect(csv.Dialect):
+    # the dialect pd.read_csv(engine="python") uses for single character delimiters
+    delimiter = ","
+    quotechar = '"'
+    escapechar = None
+    doublequote = True
+    skipinitialspace = False
+    quoting = csv.QUOTE_MINIMAL
+    lineterminator = "\n"
+    strict = True
+
+
+def tokenize_line(line: str, delimiter: str) -> Optional[List[str]]:
+    """
+    Splits a line into fields the way pd.read_csv(engine="python") does, returns None if the line
+    cannot be read or contains no data.
+    """
+    if len(delimiter) > 1:
+        # multi character delimiters are regular expressions, applied on the stripped line
+        try:
+            fields = re.split(delimiter, line.strip())
+        except re.error:
+            return None
+    elif '"' not in line and "\r" not in line and "\0" not in line:
+        fields = line.split(delimiter)
+    else:
+        try:
+            rows = list(csv.reader([line], _PythonEngineDialect, delimiter=delimiter))
+        except csv.Error:
+            return None
+        if len(rows) != 1:
+            return None
+        fields = rows[0]
+    # empty lines and lines with a single blank value are skipped by the parser
+    if len(fields) == 0 or (len(fields) == 1 and not fields[0].strip()):
+        return None
+    return fields
+
+
+def _number_regex(decimal: str, thousands: Optional[str]) -> str:
+    # the pattern pd.read_csv(engine="python") uses to decide if separators in a value are replaced
+    decimal = re.escape(decimal)
+    if thousands is None:
+        return rf"^[\-\+]?[0-9]*({decimal}[0-9]*)?([0-9]?(E|e)\-?[0-9]+)?$"
+    thousands = re.escape(thousands)
+    return (
+        rf"^[\-\+]?([0-9]+{thousands}|[0-9])*({decimal}[0-9]*)?"
+        rf"([0-9]?(E|e)\-?[0-9]+)?$"
+    )
+
+
+def classify_values(
+    values: np.ndarray, decimal: str, thousands: Optional[str]
+) -> np.ndarray:
+    """
+    Vectorized classification of raw string values into KIND_INT, KIND_FLOAT and KIND_OTHER with
+    the given decimal and thousands separators, as pd.read_csv would infer them for a single row.
+    """
+    ser = pd.Series(values, dtype=object)
+    num = _number_regex(decimal, thousands)
+    # thousands separators are removed first, then decimal separators are replaced by "."
+    replacements = [(thousands, "")] if thousands is not None else []
+    if decimal != ".":
+        replacements.append((decimal, "."))
+    for search, replace in replacements:
+        mask = ser.str.contains(search, regex=False) & ser.str.strip().str.match(num)
+        if mask.any():
+            ser = ser.where(~mask, ser.str.replace(search, replace, regex=False))
+
+    kinds = np.full(len(ser), KIND_OTHER, dtype=np.int8)
+    isfloat = ser.str.fullmatch(_FLOAT_RE).to_numpy(dtype=bool) | ser.str.fullmatch(
+        _INF_RE
+    ).to_numpy(dtype=bool)
+    if isfloat.any():
+        # values that overflow float64 are not converted
+        finite = np.isfinite(
+            ser[isfloat].str.replace(_INF_RE, "0", regex=True).astype(float)
+        )
+        isfloat[np.flatnonzero(isfloat)[~finite.to_numpy()]] = False
+    kinds[isfloat | ser.isin(NA_VALUES).to_numpy()] = KIND_FLOAT
+
+    isint = ser.str.fullmatch(_INT_RE).to_numpy(dtype=bool)
+    # values that do not fit into int64 are uint64 or objects
+    long = np.flatnonzero(isint & (ser.str.len().to_numpy() > 18))
+    for i in long:
+        if not _INT64_MIN <= int(ser.iat[i]) <= _INT64_MAX:
+            isint[i] = False
+            kinds[i] = KIND_OTHER
+    kinds[isint] = KIND_INT
+    return kinds
+
+
+def prune_delimiters(
+    rows_by_delimiter: Dict[str, List[Optional[List[str]]]], cutoff_ratio: float
+) -> List[str]:
+    """
+    Applies the structural filters of guess_best_table_params to the tokenized lines of every
+    delimiter: delimiters that read too few lines or give too few columns are dropped. Whether a
+    line can be read and its number of columns only depend on the delimiter, so all
+    (decimal, thousands) combinations of a dropped delimiter would be dropped as well and
+    never have to be classified.
+    """
+    valid_rows = {
+        delim: [row for row in rows if row is not None]
+        for delim, rows in rows_by_delimiter.items()
     }
+    valid_rows = {delim: rows for delim, rows in valid_rows.items() if rows}
+    if not valid_rows:
+        return []
+
+    max_length = max(len(rows) for rows in valid_rows.values())
+    cutoff = int(np.ceil(max_length * cutoff_ratio))
+    valid_rows = {
+        delim: rows for delim, rows in valid_rows.items() if len(rows) >= cutoff
+    }
+
+    mean_lengths = {
+        delim: float(np.mean([len(row) for row in rows]))
+        for delim, rows in valid_rows.items()
+    }
+    max_mean_length = max(mean_lengths.values()) * cutoff_ratio
+    return [delim for delim, mean in mean_lengths.items() if not mean < max_mean_length]
+
 
+def available_cores() -> int:
+    """Number of cores usable by this process."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+_PROCESS_POOLS: Dict[int, ProcessPoolExecutor] = {}
+_PROCESS_POOL_LOCK = threading.Lock()
+
+
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Returns the process pool with the given number of workers. Pools are kept alive between
+    calls since starting the processes takes longer than most sniffing runs, one per worker
+    count so that a pool is never shut down while another call uses it. The workers are
+    spawned, forking a process with running threads (e.g. the node event loop) can deadlock.
+    """
+    with _PROCESS_POOL_LOCK:
+        pool = _PROCESS_POOLS.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _PROCESS_POOLS[workers] = pool
+        return pool
+
+
+def _classify_task(task: Tuple[np.ndarray, str, Optional[str]]) -> np.ndarray:
+    return classify_values(*task)
+
+
+def score_table_info(
+    lines: List[str],
+    possible_delimiters: List[str],
+    possible_decimal_separators: List[str],
+    possible_thousands_separators: List[str],
+    cutoff_ratio: Optional[float] = None,
+    workers: int = 1,
+) -> List[Dict[Any, Any]]:
+    """
+    Vectorized counterpart of guess_table_info for many lines: every line is tokenized once per
+    delimiter and the value types of all (decimal, thousands) variants are classified on the unique
+    values at once. Returns per line a dict with the line "length" and, for every parameter set
+    (delimiter, decimal, thousands) that can read the line, an array of the value kinds.
+    If cutoff_ratio is given, delimiters that guess_best_table_params would reject for their
+    read counts or column counts with the same ratio are dropped before the value types are
+    classified, which does not change the selected parameters.
+    With workers other than 1 the parameter sets are classified in a process pool with that many
+    processes (all available cores for workers < 1), the result is the same as the serial one.
+    """
+    tableinfos: List[Dict[Any, Any]] = [{"length": len(line)} for line in lines]
+    combinations = [
+        (dec_sep, thou_sep)
+        for dec_sep in possible_decimal_separators
+        for thou_sep in possible_thousands_separators
+        # a decimal separator is required by the parser
+        if dec_sep is not None and dec_sep != thou_sep
+    ]
+
+    delimiter_combinations = {}
+    rows_by_delimiter = {}
     for delim in possible_delimiters:
-        for dec_sep in possible_decimal_separators:
-            if delim == dec_sep:
+        valid_combinations = [
+            (dec_sep, thou_sep)
+            for dec_sep, thou_sep in combinations
+            if delim != dec_sep and delim != thou_sep
+        ]
+        if not valid_combinations:
+            continue
+        delimiter_combinations[delim] = valid_combinations
+        rows_by_delimiter[delim] = [tokenize_line(line, delim) for line in lines]
+
+    if cutoff_ratio is not None:
+        remaining = set(prune_delimiters(rows_by_delimiter, cutoff_ratio))
+        rows_by_delimiter = {
+            delim: rows
+            for delim, rows in rows_by_delimiter.items()
+            if delim in remaining
+        }
+
+    tasks = []
+    for delim, rows in rows_by_delimiter.items():
+        fields = [field for row in rows if row is not None for field in row]
+        if not fields:
+            continue
+        # pd.factorize would not distinguish "" and "\0"
+        unique_index: Dict[str, int] = {}
+        codes = np.fromiter(
+            (unique_index.setdefault(field, len(unique_index)) for field in fields),
+            dtype=np.intp,
+            count=len(fields),
+        )
+        uniques = np.array(list(unique_index), dtype=object)
+        bounds = np.cumsum([0] + [len(row) for row in rows if row is not None])
+        for dec_sep, thou_sep in delimiter_combinations[delim]:
+            tasks.append((delim, dec_sep, thou_sep, rows, uniques, codes, bounds))
+
+    if workers < 1:
+        workers = available_cores()
+    workers = min(workers, len(tasks))
+    classify_args = [
+        (uniques, dec_sep, thou_sep) for _, dec_sep, thou_sep, _, uniques, _, _ in tasks
+    ]
+    if workers > 1:
+        # map keeps the order of the tasks, so the merge below is deterministic
+        unique_kinds = get_process_pool(workers).map(_classify_task, classify_args)
+    else:
+        unique_kinds = map(_classify_task, classify_args)
+
+    for (delim, dec_sep, thou_sep, rows, _, codes, bounds), ukinds in zip(
+        tasks, unique_kinds
+    ):
+        kinds = ukinds[codes]
+        j = 0
+        for i, row in enumerate(rows):
+            if row is None:
                 continue
-            for thou_sep in possible_thousands_separators:
-                if delim == thou_sep:
-                    continue
-                if dec_sep == thou_sep:
-                    continue
-
-                # try to read the line to Series
-                try:
-                    series = pd.read_csv(
-                        StringIO(line),
-                        sep=delim,
-                        decimal=dec_sep,
-                        thousands=thou_sep,
-                        header=None,
-                        index_col=False,
-                        engine="python",
-                    )
-                    lineinfo[(delim, dec_sep, thou_sep)] = series
-                except Exception:
-                    continue
-    return lineinfo
+            tableinfos[i][(delim, dec_sep, thou_sep)] = kinds[bounds[j] : bounds[j + 1]]
+            j += 1
+    return tableinfos
+
+
+# endregion scoring
 
 
 def guess_best_table_params(
@@ -69,14 +568,14 @@ def guess_best_table_params(
     # fill tableinfo_summary with None values where there is no data
     for tableinfo in tableinfos:
         for parsedata, series in tableinfo.items():
-            if not isinstance(series, pd.DataFrame):
+            if not isinstance(series, np.ndarray):
                 continue
             if parsedata not in tableinfo_summary:
                 tableinfo_summary[parsedata] = [None] * number_of_lines
 
     for i, tableinfo in enumerate(tableinfos):
         for parsedata, series in tableinfo.items():
-            if not isinstance(series, pd.DataFrame):
+            if not isinstance(series, np.ndarray):
                 continue
             tableinfo_summary[parsedata][i] = series
 
@@ -94,7 +593,7 @@ def guess_best_table_params(
     # next we filter by the mean data length, mean to make sure not a single long line is weighted to much,
     # but readings that result in the simple case of a single entry should also removed compared to many longer ones
     series_lengths = {
-        k: float(np.mean([len(x.columns) for x in v if x is not None]))
+        k: float(np.mean([len(x) for x in v if x is not None]))
         for k, v in tableinfo_summary.items()
     }
     max_mean_ser_length = max(series_lengths.values()) * cutoff_ratio
@@ -103,8 +602,7 @@ def guess_best_table_params(
             tableinfo_summary.pop(paml)
 
     series_lengths = {
-        k: [len(x.columns) for x in v if x is not None]
-        for k, v in tableinfo_summary.items()
+        k: [len(x) for x in v if x is not None] for k, v in tableinfo_summary.items()
     }
     highest_series_length_count = {
         pname: max(serl, key=serl.count) for pname, serl in series_lengths.items()
@@ -114,28 +612,17 @@ def guess_best_table_params(
     total_types = {}
     for k, v in tableinfo_summary.items():
         _max_length = highest_series_length_count[k]
-        relevant_series = [
-            x for x in v if x is not None and len(x.columns) == _max_length
-        ]
-        dtypes = []
-        for s in relevant_series:
-            dtypes.append(list(s.dtypes))
-
-        dtypes = np.array(dtypes).T.tolist()
-        number_ints = [sum([1 for x in d if x == np.dtype("int64")]) for d in dtypes]
-        number_floats = [
-            sum([1 for x in d if x == np.dtype("float64")]) for d in dtypes
-        ]
-        number_other = [
-            sum([1 for x in d if x not in [np.dtype("int64"), np.dtype("float64")]])
-            for d in dtypes
-        ]
+        relevant_series = [x for x in v if x is not None and len(x) == _max_length]
+        kinds = np.concatenate(relevant_series)
+        number_ints = int(np.count_nonzero(kinds == KIND_INT))
+        number_floats = int(np.count_nonzero(kinds == KIND_FLOAT))
+        number_other = int(np.count_nonzero(kinds == KIND_OTHER))
 
         total_types[k] = {
-            "int": sum(number_ints),
-            "float": sum(number_floats),
-            "other": sum(number_other),
-            "numerical": sum(number_ints) + sum(number_floats),
+            "int": number_ints,
+            "float": number_floats,
+            "other": number_other,
+            "numerical": number_ints + number_floats,
         }
 
     higest_numerical_value = max([v["numerical"] for v in total_types.values()])
@@ -181,31 +668,21 @@ def guess_best_table_params(
         if sers is None:
             last_drop_line = i
         else:
-            if len(sers.columns) != exp_series:
+            if len(sers) != exp_series:
                 last_drop_line = i
 
     # lastly we estimate the header, if we expect numerical values, all initial rows without numerical values are header
-    remaining_lines = checklines[last_drop_line + 1 :]
+    remaining_kinds = tableinfo_summary[parser_args][last_drop_line + 1 :]
     headerlines = -1
-    for line in remaining_lines:
-        _df = pd.read_csv(
-            StringIO(line),
-            sep=parser_args[0],
-            decimal=parser_args[1],
-            thousands=parser_args[2],
-            header=None,
-            engine="python",
-        )
-        typeslist = _df.dtypes.to_list()
-
+    for typeslist in remaining_kinds:
         if highest_float_value > 0:
-            if np.dtype("float64") in typeslist:
+            if KIND_FLOAT in typeslist:
                 break
             else:
                 headerlines += 1
                 continue
         elif highest_int_value > 0:
-            if np.dtype("int64") in typeslist:
+            if KIND_INT in typeslist:
                 break
             else:
                 headerlines += 1
@@ -230,26 +707,138 @@ def guess_best_table_params(
     }
 
 
-def auto_parse_table(
-    source: Union[str, bytes],
-    possible_delimiters: List[str] = None,
-    possible_decimal_separators: List[str] = None,
-    possible_thousands_separators: List[str] = None,
-    max_lines: int = 200,
-    cutoff_ratio: float = 0.5,
-) -> Tuple[pd.DataFrame, Dict[str, Any]]:
-    encoding = None
-    if isinstance(source, bytes):
-        encoding = detect_encoding(source)
-        stringdata = source.decode(encoding).strip()
-        lines = stringdata.split("\n")
-    elif isinstance(source, str):
-        source = source.strip()
-        lines = source.split("\n")
-        stringdata = source
-    else:
-        raise ValueError("source must be either a string or bytes")
+# region cache
+
+_DIGITS_RE = re.compile(r"[0-9]+")
+
 
+def sniff_fingerprint(lines: List[str], *args: Any) -> str:
+    """
+    Fingerprint of the format of a table: all lines the parameters are sniffed from, with every
+    run of digits collapsed, so files with the same header and layout but different values share
+    it, combined with further sniffing arguments (candidate lists, ratios). Every sniffed line is
+    part of it, since any of them can change the detected parameters.
+    """
+    shape = [
+        _DIGITS_RE.sub(lambda m: "0" if len(m.group()) <= 18 else m.group(), line)
+        for line in lines
+    ]
+    payload = json.dumps([shape, args], ensure_ascii=False)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SniffCache:
+    """
+    LRU cache of sniffed pd.read_csv parameters keyed by sniff_fingerprint. If a directory is set,
+    entries are additionally stored there as json files and survive the process.
+    """
+
+    def __init__(self, max_entries: int = 1024, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Optional[str]:
+        if self.directory is None:
+            return None
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            params = self._entries.get(key)
+            if params is not None:
+                self._entries.move_to_end(key)
+        path = self._path(key)
+        if params is None and path is not None and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    params = json.load(f)
+            except (OSError, ValueError):
+                params = None
+            if params is not None:
+                self._remember(key, params)
+        with self._lock:
+            if params is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return dict(params)
+
+    def _remember(self, key: str, params: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = params
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def put(self, key: str, params: Dict[str, Any]):
+        params = dict(params)
+        self._remember(key, params)
+        path = self._path(key)
+        if path is None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # write to a temporary file first, concurrent readers never see partial entries
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(params, f)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def discard(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+        path = self._path(key)
+        if path is not None:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        """Clears the in-memory entries and counters, the on-disk store is kept."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "directory": self.directory,
+            }
+
+
+SNIFF_CACHE = SniffCache()
+
+
+# endregion cache
+
+
+def _sniff_and_read(
+    lines: List[str],
+    read: Callable[[Dict[str, Any]], Any],
+    possible_delimiters: Optional[List[str]],
+    possible_decimal_separators: Optional[List[str]],
+    possible_thousands_separators: Optional[List[str]],
+    max_lines: int,
+    cutoff_ratio: float,
+    workers: int,
+    use_cache: bool,
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Detects the pd.read_csv parameters from the lines, served from SNIFF_CACHE if possible, and
+    calls read with them. Returns the result of read and the parameters.
+    """
     if not possible_delimiters:
         possible_delimiters = [
             ",",
@@ -272,28 +861,781 @@ def auto_parse_table(
         max_lines = len(lines) - 1
 
     checklines = lines[:max_lines]
-    tableinfos = [
-        guess_table_info(
-            line=line,
-            possible_delimiters=possible_delimiters,
-            possible_decimal_separators=possible_decimal_separators,
-            possible_thousands_separators=possible_thousands_separators,
+    cache_key = None
+    if use_cache:
+        cache_key = sniff_fingerprint(
+            checklines,
+            possible_delimiters,
+            possible_decimal_separators,
+            possible_thousands_separators,
+            max_lines,
+            cutoff_ratio,
         )
-        for line in checklines
-    ]
+        parse_params = SNIFF_CACHE.get(cache_key)
+        if parse_params is not None:
+            try:
+                return read(parse_params), parse_params
+            except Exception:
+                # the format changed after all, sniff again
+                SNIFF_CACHE.discard(cache_key)
+
+    tableinfos = score_table_info(
+        checklines,
+        possible_delimiters=possible_delimiters,
+        possible_decimal_separators=possible_decimal_separators,
+        possible_thousands_separators=possible_thousands_separators,
+        cutoff_ratio=cutoff_ratio,
+        workers=workers,
+    )
 
     parse_params, auto_params = guess_best_table_params(
         tableinfos=tableinfos,
         checklines=checklines,
         cutoff_ratio=cutoff_ratio,
     )
-    if encoding:
-        parse_params["encoding"] = encoding
 
     try:
-        df = pd.read_csv(StringIO(stringdata), **parse_params)
+        result = read(parse_params)
     except Exception as e:
         raise ValueError(
             f"Could not parse table: {e} with params: {parse_params},{auto_params}"
         )
-    return df, parse_params
+    if cache_key is not None:
+        SNIFF_CACHE.put(cache_key, parse_params)
+    return result, parse_params
+
+
+# region engine
+
+# pd.read_csv options the pyarrow engine only supports with these (default) values
+PYARROW_UNSUPPORTED_OPTIONS = {
+    "thousands": None,
+    "nrows": None,
+    "chunksize": None,
+    "skipfooter": 0,
+    "low_memory": True,
+}
+
+
+_ASCII_WS = " \t\r\n\v\f"
+_ASCII_WS_BYTES = frozenset(_ASCII_WS.encode("ascii"))
+
+
+def _ascii_compatible(encoding: str) -> bool:
+    sample = "\n\r\t ,;|.-+0123456789eE"
+    try:
+        return sample.encode(encoding) == sample.encode("ascii")
+    except (LookupError, UnicodeError):
+        return False
+
+
+class _MemoryReader(io.RawIOBase):
+    """Raw stream over a buffer (bytes, mmap, ...) from start to end, without copying it."""
+
+    def __init__(self, buffer, start: int = 0, end: Optional[int] = None):
+        super().__init__()
+        self._view = memoryview(buffer).cast("B")
+        self._start = self._pos = start
+        self._end = len(self._view) if end is None else end
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos - self._start
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {
+            io.SEEK_SET: self._start,
+            io.SEEK_CUR: self._pos,
+            io.SEEK_END: self._end,
+        }
+        self._pos = max(base[whence] + offset, self._start)
+        return self.tell()
+
+    def readinto(self, b) -> int:
+        n = min(len(b), self._end - self._pos)
+        if n <= 0:
+            return 0
+        b[:n] = self._view[self._pos : self._pos + n]
+        self._pos += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            # buffers such as mmaps can only be closed without exported views
+            self._view.release()
+        super().close()
+
+
+def _binary_handle(data, start: int = 0, end: Optional[int] = None) -> BinaryIO:
+    if isinstance(data, bytes) and start == 0 and end is None:
+        return BytesIO(data)
+    return io.BufferedReader(_MemoryReader(data, start, end))
+
+
+def source_path(source: Any) -> Optional[str]:
+    """
+    The file path of a source: os.PathLike objects are paths, strings are the content. Raises
+    FileNotFoundError if the path does not exist.
+    """
+    if not isinstance(source, os.PathLike):
+        return None
+    path = os.fspath(source)
+    if not os.path.exists(path):
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+    return path
+
+
+def read_csv_with_engine(
+    data: Union[str, bytes, memoryview, os.PathLike, BinaryIO],
+    engine: Optional[str] = None,
+    encoding: Optional[str] = None,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    pd.read_csv with the given engine ("c", "pyarrow", "python" or None for the pandas default).
+    data is CSV text, a bytes-like buffer (bytes, memoryview, mmap), a path (os.PathLike) or a
+    file handle. Buffers are parsed directly with the encoding, text is encoded for the pyarrow
+    engine and paths are memory-mapped. Compressed sources (gzip, zip, bz2, xz, zstd) are
+    decompressed while they are parsed. Engines that cannot handle the options fall back: regular
+    expression separators to the python engine, pyarrow to the c engine if it is not installed,
+    does not support an option or fails on the data.
+    """
+    compression = source_compression(data)
+    if compression is not None:
+        with contextlib.ExitStack() as stack:
+            if isinstance(data, os.PathLike):
+                raw = stack.enter_context(open(data, "rb"))
+            elif hasattr(data, "read"):
+                raw = data
+            else:
+                raw = stack.enter_context(_binary_handle(data))
+            stream = stack.enter_context(open_decompressed(raw, compression))
+            return read_csv_with_engine(stream, engine, encoding=encoding, **kwargs)
+
+    sep = kwargs.get("sep")
+    if sep is not None and len(sep) > 1 and sep != r"\s+":
+        engine = "python"
+    if engine == "python":
+        # chunked type inference of the c engine, not supported by the python engine
+        kwargs.pop("low_memory", None)
+
+    seekable = not hasattr(data, "read") or (data.seekable() and data.tell() == 0)
+    if engine == "pyarrow":
+        if (
+            pa is not None
+            and seekable
+            and all(
+                kwargs.get(option, default) in (None, default)
+                for option, default in PYARROW_UNSUPPORTED_OPTIONS.items()
+            )
+        ):
+            pa_kwargs = dict(kwargs)
+            header, skiprows = kwargs.get("header", "infer"), kwargs.get("skiprows")
+            if isinstance(header, int) and isinstance(skiprows, int):
+                # the pyarrow engine misplaces the header after skipped rows, both are lines
+                # from the start for the c engine
+                pa_kwargs["header"], pa_kwargs["skiprows"] = header + skiprows, None
+            try:
+                if isinstance(data, str):
+                    with BytesIO(data.encode("utf-8")) as handle:
+                        df = pd.read_csv(
+                            handle, engine="pyarrow", encoding="utf-8", **pa_kwargs
+                        )
+                elif isinstance(data, os.PathLike) or hasattr(data, "read"):
+                    df = pd.read_csv(
+                        data, engine="pyarrow", encoding=encoding, **pa_kwargs
+                    )
+                else:
+                    with _binary_handle(data) as handle:
+                        df = pd.read_csv(
+                            handle, engine="pyarrow", encoding=encoding, **pa_kwargs
+                        )
+                # duplicated column names are not mangled by the pyarrow engine
+                if not df.columns.has_duplicates:
+                    return df
+            except Exception:
+                pass
+            if hasattr(data, "read"):
+                data.seek(0)
+        engine = "c"
+
+    if isinstance(data, str):
+        return pd.read_csv(StringIO(data), engine=engine, **kwargs)
+    if isinstance(data, os.PathLike):
+        return pd.read_csv(
+            data, engine=engine, encoding=encoding, memory_map=True, **kwargs
+        )
+    if hasattr(data, "read"):
+        return pd.read_csv(data, engine=engine, encoding=encoding, **kwargs)
+    with _binary_handle(data) as handle:
+        return pd.read_csv(handle, engine=engine, encoding=encoding, **kwargs)
+
+
+# endregion engine
+
+
+# region dtypes
+
+# text columns with at most this ratio of distinct to non-missing values are read as category
+CATEGORY_MAX_RATIO = 0.5
+
+
+def _narrow_int_dtype(values: pd.Series) -> Optional[str]:
+    if values.empty:
+        return None
+    low, high = values.min(), values.max()
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype).name
+    return None
+
+
+def _float32_lossless(values: pd.Series) -> bool:
+    arr = values.to_numpy()
+    return bool(np.array_equal(arr, arr.astype(np.float32), equal_nan=True))
+
+
+def infer_compact_dtypes(
+    sample: pd.DataFrame, category_max_ratio: float = CATEGORY_MAX_RATIO
+) -> Dict[Any, str]:
+    """
+    Compact dtypes for the columns of a sample read with the default inference: the narrowest
+    signed integer type holding the sampled integers, float32 if the sampled floats survive the
+    conversion unchanged and category for text with few distinct values.
+    """
+    dtypes = {}
+    for column in sample.columns:
+        values = sample[column]
+        if values.dtype == np.int64:
+            dtype = _narrow_int_dtype(values)
+            if dtype is not None:
+                dtypes[column] = dtype
+        elif values.dtype == np.float64:
+            if values.notna().any() and _float32_lossless(values):
+                dtypes[column] = "float32"
+        elif values.dtype == object:
+            count = values.count()
+            if count and values.nunique() <= count * category_max_ratio:
+                dtypes[column] = "category"
+    return dtypes
+
+
+def read_with_inferred_dtypes(
+    read: Callable[..., pd.DataFrame], parse_params: Dict[str, Any], sample_rows: int
+) -> Tuple[pd.DataFrame, Dict[Any, str]]:
+    """
+    Reads the table with read (pd.read_csv bound to the source) and dtypes inferred from its first
+    sample_rows rows. Categories are passed to pd.read_csv directly, numeric narrowings only if the
+    sample is the whole table, since pd.read_csv silently wraps integers that exceed the given
+    type. Otherwise they are applied after the read where all values fit. Returns the frame and
+    the applied dtype map.
+    """
+    sample = read(nrows=sample_rows, **parse_params)
+    dtypes = infer_compact_dtypes(sample)
+    complete = len(sample) < sample_rows
+    read_dtypes = {
+        column: dtype
+        for column, dtype in dtypes.items()
+        if complete or dtype == "category"
+    }
+    df = read(dtype=read_dtypes or None, **parse_params)
+    if complete:
+        return df, read_dtypes
+
+    applied = dict(read_dtypes)
+    for column, dtype in dtypes.items():
+        if column in applied:
+            continue
+        values = df[column]
+        if dtype == "float32":
+            fits = values.dtype == np.float64 and _float32_lossless(values)
+        else:
+            fits = values.dtype == np.int64 and _narrow_int_dtype(values) is not None
+            if fits:
+                # the whole column may need a wider type than the sample
+                dtype = _narrow_int_dtype(values)
+        if fits:
+            df[column] = values.astype(dtype)
+            applied[column] = dtype
+    return df, applied
+
+
+# endregion dtypes
+
+
+def auto_parse_table(
+    source: Union[str, bytes, os.PathLike, BinaryIO],
+    possible_delimiters: List[str] = None,
+    possible_decimal_separators: List[str] = None,
+    possible_thousands_separators: List[str] = None,
+    max_lines: int = 200,
+    cutoff_ratio: float = 0.5,
+    workers: int = 1,
+    use_cache: bool = True,
+    infer_dtypes: bool = False,
+    engine: Optional[str] = None,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    sniff_args = dict(
+        possible_delimiters=possible_delimiters,
+        possible_decimal_separators=possible_decimal_separators,
+        possible_thousands_separators=possible_thousands_separators,
+        max_lines=max_lines,
+        cutoff_ratio=cutoff_ratio,
+        workers=workers,
+        use_cache=use_cache,
+    )
+    path = source_path(source)
+    if path is not None or hasattr(source, "read"):
+        return _auto_parse_file(
+            source if path is None else path, engine, infer_dtypes, **sniff_args
+        )
+    compression = source_compression(source)
+    if compression is not None:
+
+        @contextlib.contextmanager
+        def decompressed():
+            with open_decompressed(BytesIO(source), compression) as stream:
+                yield stream
+
+        return _auto_parse_stream(decompressed, engine, infer_dtypes, **sniff_args)
+    if engine is not None and isinstance(source, bytes):
+        parsed = _auto_parse_bytes(source, engine, infer_dtypes, **sniff_args)
+        if parsed is not None:
+            return parsed
+
+    encoding_info = None
+    if isinstance(source, bytes):
+        stringdata, encoding_info = decode_bytes(source)
+        stringdata = stringdata.strip()
+        lines = stringdata.split("\n")
+    elif isinstance(source, str):
+        source = source.strip()
+        lines = source.split("\n")
+        stringdata = source
+    else:
+        raise ValueError("source must be either a string or bytes")
+
+    def read_text(**kwargs) -> pd.DataFrame:
+        return read_csv_with_engine(stringdata, engine, **kwargs)
+
+    (df, dtypes), parse_params = _sniff_and_read(
+        lines, _table_reader(read_text, infer_dtypes, max_lines), **sniff_args
+    )
+    return df, _with_dtypes_and_encoding(parse_params, dtypes, encoding_info)
+
+
+def _table_reader(
+    read: Callable[..., pd.DataFrame], infer_dtypes: bool, sample_rows: int
+) -> Callable[[Dict[str, Any]], Tuple[pd.DataFrame, Optional[Dict[Any, str]]]]:
+    def read_table(params: Dict[str, Any]):
+        if infer_dtypes:
+            return read_with_inferred_dtypes(read, params, sample_rows)
+        return read(**params), None
+
+    return read_table
+
+
+def _auto_parse_file(
+    source: Union[str, BinaryIO, io.TextIOBase],
+    engine: Optional[str],
+    infer_dtypes: bool,
+    **sniff_args,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    auto_parse_table for a file path or an open file. Files are memory-mapped, only the sniffed
+    head is decoded and the engine parses the mapped bytes. Compressed files are decompressed
+    while they are parsed. Text handles, streams without a file descriptor and handles that are
+    not at their start are read as a whole instead.
+    """
+    with contextlib.ExitStack() as stack:
+        if isinstance(source, str):
+            handle = stack.enter_context(open(source, "rb"))
+        else:
+            handle = source
+        if isinstance(handle, io.TextIOBase):
+            return auto_parse_table(
+                handle.read(), engine=engine, infer_dtypes=infer_dtypes, **sniff_args
+            )
+        compression = detect_compression(_peek(handle, COMPRESSION_MAGIC_SIZE))
+        if compression is not None and handle.seekable():
+            start = handle.tell()
+
+            @contextlib.contextmanager
+            def decompressed():
+                handle.seek(start)
+                with open_decompressed(handle, compression) as stream:
+                    yield stream
+
+            return _auto_parse_stream(decompressed, engine, infer_dtypes, **sniff_args)
+        try:
+            fileno = handle.fileno()
+            mappable = handle.tell() == 0 and os.fstat(fileno).st_size > 0
+        except (AttributeError, OSError, ValueError):
+            mappable = False
+        if not mappable:
+            return auto_parse_table(
+                handle.read(), engine=engine, infer_dtypes=infer_dtypes, **sniff_args
+            )
+        mapped = stack.enter_context(mmap.mmap(fileno, 0, access=mmap.ACCESS_READ))
+        parsed = _auto_parse_bytes(mapped, engine, infer_dtypes, **sniff_args)
+        if parsed is not None:
+            return parsed
+        return auto_parse_table(
+            mapped[:], engine=engine, infer_dtypes=infer_dtypes, **sniff_args
+        )
+
+
+def _auto_parse_bytes(
+    source: Union[bytes, mmap.mmap],
+    engine: Optional[str],
+    infer_dtypes: bool,
+    max_lines: int,
+    **sniff_args,
+) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+    """
+    auto_parse_table for a bytes-like buffer that only decodes the sniffed head, the table itself
+    is parsed by the engine from the buffer without copying it. Returns None if the encoding does
+    not allow it (not ascii compatible or unusual leading whitespace), then the source has to be
+    decoded as a whole.
+    """
+    with _binary_handle(source) as handle:
+        head, _, encoding_info, lead, sniff_text = _read_head_lines(
+            handle, ENCODING_BYTE_BUDGET, max_lines
+        )
+    start, encoding = 0, encoding_info["encoding"]
+    if encoding == "utf-8-sig":
+        start, encoding = len(codecs.BOM_UTF8), "utf-8"
+    if not _ascii_compatible(encoding) or head[:lead].strip(_ASCII_WS):
+        return None
+    # strip the source like the text, ascii whitespace has one byte per character
+    start += lead
+    end = len(source)
+    while end > start and source[end - 1] in _ASCII_WS_BYTES:
+        end -= 1
+    tail = bytes(source[max(end - 4, start) : end])
+    if tail.decode(encoding, "ignore")[-1:].isspace():
+        # non ascii trailing whitespace
+        return None
+
+    def read_bytes(**kwargs) -> pd.DataFrame:
+        nonlocal encoding_info
+        try:
+            with _binary_handle(source, start, end) as handle:
+                return read_csv_with_engine(handle, engine, encoding=encoding, **kwargs)
+        except UnicodeDecodeError:
+            # the sampled encoding does not hold for the whole source
+            text, encoding_info = decode_bytes(bytes(source))
+            return read_csv_with_engine(text.strip(), engine, **kwargs)
+
+    (df, dtypes), parse_params = _sniff_and_read(
+        sniff_text.split("\n"),
+        _table_reader(read_bytes, infer_dtypes, max_lines),
+        max_lines=max_lines,
+        **sniff_args,
+    )
+    return df, _with_dtypes_and_encoding(parse_params, dtypes, encoding_info)
+
+
+def _with_dtypes_and_encoding(
+    parse_params: Dict[str, Any],
+    dtypes: Optional[Dict[Any, str]],
+    encoding_info: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    if dtypes is not None:
+        # added after the read, the cached parameters stay independent of the values
+        parse_params["dtype"] = dtypes
+    return _with_encoding(parse_params, encoding_info)
+
+
+def _with_encoding(
+    parse_params: Dict[str, Any], encoding_info: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    if encoding_info:
+        parse_params["encoding"] = encoding_info["encoding"]
+        # informative only, not a pd.read_csv argument
+        parse_params["encoding_confidence"] = encoding_info["confidence"]
+    return parse_params
+
+
+# region streaming
+
+# bytes read from a stream to detect the encoding and the parameters
+STREAM_HEAD_BYTES = 1024 * 1024
+STREAM_READ_SIZE = 64 * 1024
+
+
+class _TextStream(io.TextIOBase):
+    """
+    Read-only text stream that returns an already decoded head followed by the lazily read rest
+    of the source, so pd.read_csv can consume the source without it being resident at once.
+    """
+
+    def __init__(self, head: str, read_more: Callable[[], str]):
+        super().__init__()
+        self._buffer = head
+        self._pos = 0
+        self._read_more = read_more
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        text = self._read_more()
+        if not text:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos :] + text
+        self._pos = 0
+        return True
+
+    def _take(self, end: int) -> str:
+        text = self._buffer[self._pos : end]
+        self._pos = end
+        return text
+
+    def read(self, size: Optional[int] = -1) -> str:
+        if size is None or size < 0:
+            while self._fill():
+                pass
+            return self._take(len(self._buffer))
+        while len(self._buffer) - self._pos < size and self._fill():
+            pass
+        return self._take(min(self._pos + size, len(self._buffer)))
+
+    def readline(self, size: Optional[int] = -1) -> str:
+        search = self._pos
+        while True:
+            end = self._buffer.find("\n", search)
+            if end >= 0:
+                end += 1
+                break
+            searched = len(self._buffer) - self._pos
+            if not self._fill():
+                end = len(self._buffer)
+                break
+            search = self._pos + searched
+        if size is not None and size >= 0:
+            end = min(end, self._pos + size)
+        return self._take(end)
+
+
+def _read_head(
+    stream: Union[BinaryIO, io.TextIOBase], head_bytes: int
+) -> Tuple[str, Callable[[], str], Optional[Dict[str, Any]]]:
+    """
+    Reads and decodes the head of a binary or text stream. Returns the head, a function returning
+    the next decoded text of the rest ("" at the end) and the encoding info for binary streams.
+    """
+    head = stream.read(head_bytes)
+    if isinstance(head, str):
+        return head, lambda: stream.read(STREAM_READ_SIZE), None
+
+    encoding_info = detect_encoding_info(head, max_bytes=head_bytes)
+    decoder = codecs.getincrementaldecoder(encoding_info["encoding"])(errors="replace")
+    return (
+        decoder.decode(head, final=False),
+        _decoding_reader(stream, decoder),
+        encoding_info,
+    )
+
+
+def _decoding_reader(
+    stream: BinaryIO, decoder: codecs.IncrementalDecoder
+) -> Callable[[], str]:
+    def read_more() -> str:
+        while True:
+            chunk = stream.read(STREAM_READ_SIZE)
+            text = decoder.decode(chunk, final=not chunk)
+            if text or not chunk:
+                return text
+
+    return read_more
+
+
+_LEADING_WS_RE = re.compile(r"\s*")
+
+
+def _read_head_lines(
+    stream: Union[BinaryIO, io.TextIOBase], head_bytes: int, min_lines: int
+) -> Tuple[str, Callable[[], str], Optional[Dict[str, Any]], int, str]:
+    """
+    Reads the head of a stream, extended to at least min_lines complete lines after the leading
+    whitespace or the end of the stream. Returns the head, the function reading the rest, the
+    encoding info, the number of leading whitespace characters and the text to sniff, which is
+    the stripped head without a trailing incomplete line, as auto_parse_table would see it.
+    """
+    head, read_more, encoding_info = _read_head(stream, head_bytes)
+    newlines = head.count("\n")
+    while True:
+        more = read_more()
+        head += more
+        newlines += more.count("\n")
+        if not more:
+            content = head.strip()
+            break
+        lead = _LEADING_WS_RE.match(head).end()
+        if lead < len(head) and newlines - head.count("\n", 0, lead) >= max(
+            min_lines, 1
+        ):
+            content = head[lead:]
+            # the last line of the head may be incomplete
+            content = content[: content.rfind("\n")]
+            break
+    lead = _LEADING_WS_RE.match(head).end()
+    return head, read_more, encoding_info, lead, content
+
+
+def iter_parse_table(
+    source: Union[str, bytes, os.PathLike, BinaryIO, io.TextIOBase],
+    chunksize: int = 100_000,
+    possible_delimiters: List[str] = None,
+    possible_decimal_separators: List[str] = None,
+    possible_thousands_separators: List[str] = None,
+    max_lines: int = 200,
+    cutoff_ratio: float = 0.5,
+    workers: int = 1,
+    use_cache: bool = True,
+    head_bytes: int = STREAM_HEAD_BYTES,
+) -> Tuple[Iterator[pd.DataFrame], Dict[str, Any]]:
+    """
+    Streaming variant of auto_parse_table: the encoding and parameters are detected from the first
+    head_bytes of the source, the table is then read lazily in DataFrames of up to chunksize rows.
+    Returns the chunk iterator and the detected parameters. An open source (e.g. a file) has to
+    stay open until the iterator is exhausted, a file opened from a path is closed with the
+    iterator. Compressed sources are decompressed while they are read. Bytes that cannot be
+    decoded are replaced.
+    """
+    path = source_path(source)
+    opened = contextlib.ExitStack()
+    if path is not None:
+        source = opened.enter_context(open(path, "rb"))
+    elif isinstance(source, bytes):
+        source = io.BytesIO(source)
+    elif isinstance(source, str):
+        source = io.StringIO(source)
+    elif not hasattr(source, "read"):
+        raise ValueError(
+            "source must be either a string, bytes, a path or a readable stream"
+        )
+
+    try:
+        compression = detect_compression(_peek(source, COMPRESSION_MAGIC_SIZE))
+        if compression is not None:
+            source = opened.enter_context(open_decompressed(source, compression))
+        head, read_more, encoding_info, lead, sniff_text = _read_head_lines(
+            source, head_bytes, max_lines
+        )
+        text = _TextStream(head, read_more)
+        # auto_parse_table strips the source, leading blank lines and spaces are skipped as well
+        text.read(lead)
+        lines = sniff_text.split("\n")
+
+        _, parse_params = _sniff_and_read(
+            lines,
+            lambda params: pd.read_csv(StringIO(sniff_text), **params),
+            possible_delimiters=possible_delimiters,
+            possible_decimal_separators=possible_decimal_separators,
+            possible_thousands_separators=possible_thousands_separators,
+            max_lines=max_lines,
+            cutoff_ratio=cutoff_ratio,
+            workers=workers,
+            use_cache=use_cache,
+        )
+    except BaseException:
+        opened.close()
+        raise
+
+    def chunks() -> Iterator[pd.DataFrame]:
+        with opened, pd.read_csv(text, chunksize=chunksize, **parse_params) as reader:
+            yield from reader
+
+    return chunks(), _with_encoding(dict(parse_params), encoding_info)
+
+
+def _auto_parse_stream(
+    open_stream: Callable[[], ContextManager[BinaryIO]],
+    engine: Optional[str],
+    infer_dtypes: bool,
+    max_lines: int,
+    **sniff_args,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    auto_parse_table for a binary stream that can be opened repeatedly but is only read forward,
+    e.g. a decompressing stream. The head is decoded and sniffed from a first stream, each read of
+    the table decodes a new stream while pd.read_csv consumes it.
+    """
+    with open_stream() as stream:
+        _, _, encoding_info, lead, sniff_text = _read_head_lines(
+            stream, ENCODING_BYTE_BUDGET, max_lines
+        )
+
+    def read_stream(**kwargs) -> pd.DataFrame:
+        with open_stream() as stream:
+            decoder = codecs.getincrementaldecoder(encoding_info["encoding"])(
+                errors="replace"
+            )
+            text = _TextStream("", _decoding_reader(stream, decoder))
+            # auto_parse_table strips the source, leading blank lines and spaces are skipped
+            text.read(lead)
+            return read_csv_with_engine(text, engine, **kwargs)
+
+    (df, dtypes), parse_params = _sniff_and_read(
+        sniff_text.split("\n"),
+        _table_reader(read_stream, infer_dtypes, max_lines),
+        max_lines=max_lines,
+        **sniff_args,
+    )
+    return df, _with_dtypes_and_encoding(parse_params, dtypes, encoding_info)
+
+
+def auto_parse_archive(
+    source: Union[bytes, os.PathLike, str, BinaryIO],
+    possible_delimiters: List[str] = None,
+    possible_decimal_separators: List[str] = None,
+    possible_thousands_separators: List[str] = None,
+    max_lines: int = 200,
+    cutoff_ratio: float = 0.5,
+    workers: int = 1,
+    use_cache: bool = True,
+    infer_dtypes: bool = False,
+    engine: Optional[str] = None,
+) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Dict[str, Any]]]:
+    """
+    auto_parse_table for each file of a zip archive (bytes, path or seekable binary stream), the
+    members are decompressed while they are parsed. Returns the frames and the detected parameters
+    by member name.
+    """
+    with contextlib.ExitStack() as stack:
+        path = source_path(source)
+        if path is not None:
+            source = stack.enter_context(open(path, "rb"))
+        elif not hasattr(source, "read"):
+            source = BytesIO(source)
+        archive = stack.enter_context(zipfile.ZipFile(source))
+        frames, params = {}, {}
+        for member in zip_members(archive):
+            frames[member], params[member] = _auto_parse_stream(
+                lambda member=member: archive.open(member),
+                engine,
+                infer_dtypes,
+                possible_delimiters=possible_delimiters,
+                possible_decimal_separators=possible_decimal_separators,
+                possible_thousands_separators=possible_thousands_separators,
+                max_lines=max_lines,
+                cutoff_ratio=cutoff_ratio,
+                workers=workers,
+                use_cache=use_cache,
+            )
+        return frames, params
+
+
+# endregion streaming
@@ -1,11 +1,35 @@
 import pandas as pd
 import funcnodes as fn
-from typing import Optional, Literal, Union, List, Tuple
+from typing import Optional, Literal, Union, List, Tuple, Iterator
 from ._types import DataFrameDict, SepEnum, DecimalEnum
-from io import StringIO, BytesIO
+import io
+from io import BytesIO
+from pathlib import Path
 import numpy as np
 from funcnodes_basic.strings import POSSIBLE_DECODINGS_TYPE
-from ._autoreader import auto_parse_table
+from ._autoreader import (
+    auto_parse_archive,
+    auto_parse_table,
+    read_csv_with_engine,
+    source_path,
+)
+from ._excelreader import WORKBOOK_CACHE, excel_sheet_names
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = feather = pq = None
+
+
+def _column_list(columns: Union[str, List[str], None]) -> Optional[List[str]]:
+    # a picked value option is a single column name, not a list of its characters
+    if isinstance(columns, str):
+        return [columns]
+    return list(columns) if columns else None
+
+
 # region dict
 
 
@@ -105,12 +129,43 @@ def from_orient_dict(
 # region csv
 
 
+def _csv_source(source, source_is_path: bool):
+    # strings are the CSV content unless they are marked as a path
+    if source_is_path and isinstance(source, str):
+        return Path(source)
+    return source
+
+
+def _csv_column_options(src, result):
+    # header only read of the source, offers the columns for the projection
+    node = src.node
+    if node is None or hasattr(result, "read"):
+        return
+    try:
+        source = _csv_source(result, node["source_is_path"].value)
+        columns = read_csv_with_engine(
+            source,
+            encoding=None if isinstance(source, str) else node["encoding"].value,
+            sep=SepEnum.v(node["sep"].value),
+            skiprows=node["skiprows"].value,
+            nrows=0,
+        ).columns
+    except Exception:
+        return
+    node["usecols"].update_value_options(options=[str(c) for c in columns])
+
+
 @fn.NodeDecorator(
     node_id="pd.df_from_csv_str",
     name="From CSV",
     description="Reads a CSV file into a DataFrame.",
     outputs=[{"name": "df", "type": pd.DataFrame}],
     default_io_options={
+        "source": {
+            "on": {
+                "after_set_value": _csv_column_options,
+            }
+        },
         "skiprows": {
             "hidden": True,
         },
@@ -120,6 +175,27 @@ def from_orient_dict(
         "encoding": {
             "hidden": True,
         },
+        "engine": {
+            "hidden": True,
+        },
+        "nrows": {
+            "hidden": True,
+        },
+        "dtype": {
+            "hidden": True,
+        },
+        "parse_dates": {
+            "hidden": True,
+        },
+        "na_values": {
+            "hidden": True,
+        },
+        "low_memory": {
+            "hidden": True,
+        },
+        "source_is_path": {
+            "hidden": True,
+        },
     },
 )
 def from_csv_str(
@@ -129,21 +205,34 @@ def from_csv_str(
     thousands: Optional[DecimalEnum] = None,
     skiprows: Optional[int] = None,
     encoding: POSSIBLE_DECODINGS_TYPE = "utf-8",
+    engine: Optional[Literal["c", "pyarrow", "python"]] = None,
+    usecols: Optional[List[str]] = None,
+    nrows: Optional[int] = None,
+    dtype: Optional[Union[str, dict]] = None,
+    parse_dates: Optional[List[str]] = None,
+    na_values: Optional[List[str]] = None,
+    low_memory: bool = True,
+    source_is_path: bool = False,
 ) -> pd.DataFrame:
     sep = SepEnum.v(sep)
     decimal = DecimalEnum.v(decimal)
     thousands = DecimalEnum.v(thousands) if thousands is not None else None
-    if isinstance(source, bytes):
-        data = BytesIO(source)
-    else:
-        data = StringIO(source)
-    return pd.read_csv(
-        data,
+    # read_csv_with_engine memory-maps paths
+    source = _csv_source(source, source_is_path)
+    return read_csv_with_engine(
+        source,
+        engine,
+        encoding=None if isinstance(source, (str, io.TextIOBase)) else encoding,
         sep=sep,
         decimal=decimal,
         thousands=thousands,
         skiprows=skiprows,
-        encoding=encoding,
+        usecols=_column_list(usecols),
+        nrows=nrows,
+        dtype=dtype,
+        parse_dates=parse_dates or None,
+        na_values=na_values or None,
+        low_memory=low_memory,
     )
 
 
@@ -172,6 +261,12 @@ def to_csv_str(
     name="From CSV Auto",
     description="Reads a CSV file into a DataFrame. Automatically detects the parameters.",
     outputs=[{"name": "df"}, {"name": "params"}],
+    default_io_options={
+        "source_is_path": {
+            "hidden": True,
+        },
+    },
+    separate_thread=True,
 )
 def from_csv_auto(
     source: Union[str, bytes],
@@ -180,18 +275,60 @@ def from_csv_auto(
     possible_thousands_separators: List[str] = None,
     max_lines: int = 200,
     cutoff_ratio: float = 0.5,
+    workers: int = 1,
+    use_cache: bool = True,
+    infer_dtypes: bool = False,
+    engine: Optional[Literal["c", "pyarrow"]] = None,
+    source_is_path: bool = False,
 ) -> Tuple[pd.DataFrame, dict]:
     df, params = auto_parse_table(
-        source,
+        _csv_source(source, source_is_path),
         possible_delimiters=possible_delimiters,
         possible_decimal_separators=possible_decimal_separators,
         possible_thousands_separators=possible_thousands_separators,
         max_lines=max_lines,
         cutoff_ratio=cutoff_ratio,
+        workers=workers,
+        use_cache=use_cache,
+        infer_dtypes=infer_dtypes,
+        engine=engine,
     )
     return df, params
 
 
+@fn.NodeDecorator(
+    node_id="pd.df_from_csv_archive",
+    name="From CSV Archive",
+    description="Reads the CSV files of a zip archive into DataFrames. Automatically detects "
+    "the parameters.",
+    outputs=[{"name": "frames"}, {"name": "df"}, {"name": "params"}],
+    default_io_options={
+        "source_is_path": {
+            "hidden": True,
+        },
+    },
+    separate_thread=True,
+)
+def from_csv_archive(
+    source: Union[str, bytes],
+    concat: bool = False,
+    use_cache: bool = True,
+    infer_dtypes: bool = False,
+    engine: Optional[Literal["c", "pyarrow"]] = None,
+    source_is_path: bool = False,
+) -> Tuple[dict, Optional[pd.DataFrame], dict]:
+    frames, params = auto_parse_archive(
+        _csv_source(source, source_is_path),
+        use_cache=use_cache,
+        infer_dtypes=infer_dtypes,
+        engine=engine,
+    )
+    df = None
+    if concat and frames:
+        df = pd.concat(frames, names=["member", None])
+    return frames, df, params
+
+
 # endregion csv
 
 # region excel
@@ -205,9 +342,9 @@ def from_csv_auto(
     default_io_options={
         "data": {
             "on": {
-                "after_set_value": fn.decorator.update_other_io(
+                "after_set_value": fn.decorator.update_other_io_options(
                     "sheet",
-                    lambda x: pd.ExcelFile(BytesIO(x)).sheet_names,
+                    excel_sheet_names,
                 )
             }
         }
@@ -217,8 +354,9 @@ def DfFromExcelNode(data: bytes, sheet: Optional[str] = None, with_index: bool =
     # if sheed is not provided, we return the first sheet
     if sheet is None:
         sheet = 0
+    # the opened workbook is reused when further sheets of the same data are read
     return pd.read_excel(
-        BytesIO(data), sheet_name=sheet, index_col=0 if with_index else None
+        WORKBOOK_CACHE.get(data), sheet_name=sheet, index_col=0 if with_index else None
     )
 
 
@@ -250,6 +388,272 @@ def df_to_xls(
 # endregion excel
 
 
+# region parquet
+
+
+def _file_path(data: Union[str, bytes]) -> Optional[str]:
+    # Parquet and Arrow IPC are binary, strings are file paths
+    return source_path(Path(data) if isinstance(data, str) else data)
+
+
+def _arrow_source(data: Union[str, bytes]):
+    # paths are memory-mapped by pyarrow, buffers are wrapped without copying
+    if pa is None:
+        raise ImportError("Parquet and Feather support requires the pyarrow package")
+    path = _file_path(data)
+    if path is not None:
+        return path
+    return pa.BufferReader(data)
+
+
+def _parquet_filter(filters: Optional[List[list]]):
+    if not filters:
+        return None
+    return pq.filters_to_expression([tuple(f) for f in filters])
+
+
+def _parquet_read_columns(
+    columns: Optional[List[str]], filters: Optional[List[list]]
+) -> Optional[List[str]]:
+    # the filtered columns have to be read to evaluate the filters
+    if columns is None or not filters:
+        return columns
+    return list(dict.fromkeys(list(columns) + [f[0] for f in filters]))
+
+
+def _parquet_project(table, columns: Optional[List[str]]):
+    # drops the columns only read for the filters, the index columns are kept
+    if columns is None:
+        return table
+    keep = set(columns)
+    metadata = table.schema.pandas_metadata or {}
+    keep.update(c for c in metadata.get("index_columns", []) if isinstance(c, str))
+    return table.select([name for name in table.column_names if name in keep])
+
+
+def iter_parquet_batches(
+    data: Union[str, bytes],
+    batch_size: int = 65_536,
+    columns: Optional[List[str]] = None,
+    filters: Optional[List[list]] = None,
+    row_groups: Optional[List[int]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Reads a Parquet file (path or bytes) lazily in DataFrames of up to batch_size rows, only the
+    given columns and row groups are read. filters are (column, op, value) conditions as for
+    pd.read_parquet, applied to each batch, batches without a matching row are skipped.
+    """
+    source = _arrow_source(data)
+    columns = _column_list(columns)
+    expression = _parquet_filter(filters)
+    with pq.ParquetFile(source) as parquet:
+        for batch in parquet.iter_batches(
+            batch_size=batch_size,
+            row_groups=row_groups,
+            columns=_parquet_read_columns(columns, filters),
+            use_pandas_metadata=True,
+        ):
+            table = pa.Table.from_batches([batch])
+            if expression is not None:
+                table = table.filter(expression)
+                if not table.num_rows:
+                    continue
+            yield _parquet_project(table, columns).to_pandas()
+
+
+def _parquet_columns(data: Union[str, bytes]) -> List[str]:
+    # only the footer is read
+    schema = pq.read_schema(_arrow_source(data))
+    return [name for name in schema.names if not name.startswith("__index_level_")]
+
+
+@fn.NodeDecorator(
+    node_id="pd.df_from_parquet",
+    name="From Parquet",
+    description="Reads a Parquet file into a DataFrame.",
+    outputs=[{"name": "df", "type": pd.DataFrame}],
+    default_io_options={
+        "data": {
+            "on": {
+                "after_set_value": fn.decorator.update_other_io_options(
+                    "columns",
+                    _parquet_columns,
+                )
+            }
+        },
+        "row_groups": {
+            "hidden": True,
+        },
+    },
+    separate_thread=True,
+)
+def df_from_parquet(
+    data: Union[str, bytes],
+    columns: Optional[List[str]] = None,
+    filters: Optional[List[list]] = None,
+    row_groups: Optional[List[int]] = None,
+) -> pd.DataFrame:
+    source = _arrow_source(data)
+    columns = _column_list(columns)
+    read_columns = _parquet_read_columns(columns, filters)
+    # the index columns are read in both cases
+    if row_groups is not None:
+        with pq.ParquetFile(source) as parquet:
+            table = parquet.read_row_groups(
+                row_groups, columns=read_columns, use_pandas_metadata=True
+            )
+        expression = _parquet_filter(filters)
+        if expression is not None:
+            table = table.filter(expression)
+    else:
+        # filters skip row groups by their statistics before rows are filtered
+        table = pq.read_table(
+            source,
+            columns=read_columns,
+            filters=_parquet_filter(filters),
+            use_pandas_metadata=True,
+        )
+    return _parquet_project(table, columns).to_pandas()
+
+
+@fn.NodeDecorator(
+    node_id="pd.df_to_parquet",
+    name="To Parquet",
+    description="Writes a DataFrame to a Parquet file.",
+    outputs=[{"name": "parquet"}],
+    default_io_options={
+        "row_group_size": {
+            "hidden": True,
+        },
+        "use_dictionary": {
+            "hidden": True,
+        },
+    },
+)
+def df_to_parquet(
+    df: pd.DataFrame,
+    compression: Literal["snappy", "zstd", "gzip", "brotli", "lz4", "none"] = "snappy",
+    row_group_size: Optional[int] = None,
+    use_dictionary: Union[bool, List[str]] = True,
+    with_index: bool = False,
+) -> bytes:
+    output = BytesIO()
+    df.to_parquet(
+        output,
+        engine="pyarrow",
+        compression=None if compression == "none" else compression,
+        index=with_index,
+        row_group_size=row_group_size,
+        use_dictionary=use_dictionary,
+    )
+    data = output.getvalue()
+    output.close()
+    return data
+
+
+# endregion parquet
+
+
+# region feather
+
+
+def _ipc_source(data: Union[str, bytes]):
+    if pa is None:
+        raise ImportError("Parquet and Feather support requires the pyarrow package")
+    path = _file_path(data)
+    return pa.memory_map(path, "r") if path is not None else pa.BufferReader(data)
+
+
+def _open_ipc(source):
+    try:
+        return pa.ipc.open_file(source)
+    except pa.ArrowInvalid:
+        # arrow ipc stream format
+        source.seek(0)
+        return pa.ipc.open_stream(source)
+
+
+def _read_ipc(data: Union[str, bytes], columns: Optional[List[str]] = None):
+    # the table references the mapped file or the bytes, it stays valid after closing the source
+    with _ipc_source(data) as source:
+        table = _open_ipc(source).read_all()
+    columns = _column_list(columns)
+    if columns:
+        index_columns = [
+            column
+            for column in (table.schema.pandas_metadata or {}).get("index_columns", [])
+            if isinstance(column, str) and column not in columns
+        ]
+        table = table.select(columns + index_columns)
+    return table
+
+
+def _feather_columns(data: Union[str, bytes]) -> List[str]:
+    with _ipc_source(data) as source:
+        schema = _open_ipc(source).schema
+    index_columns = (schema.pandas_metadata or {}).get("index_columns", [])
+    return [name for name in schema.names if name not in index_columns]
+
+
+@fn.NodeDecorator(
+    node_id="pd.df_from_feather",
+    name="From Feather",
+    description="Reads a Feather (Arrow IPC) file into a DataFrame. Without copy, the columns "
+    "stay memory-mapped and read-only.",
+    outputs=[{"name": "df", "type": pd.DataFrame}],
+    default_io_options={
+        "data": {
+            "on": {
+                "after_set_value": fn.decorator.update_other_io_options(
+                    "columns",
+                    _feather_columns,
+                )
+            }
+        },
+        "copy": {
+            "hidden": True,
+        },
+    },
+)
+def df_from_feather(
+    data: Union[str, bytes],
+    columns: Optional[List[str]] = None,
+    copy: bool = True,
+) -> pd.DataFrame:
+    table = _read_ipc(data, columns)
+    # uncompressed columns in a single record batch without nulls are wrapped without a copy,
+    # those arrays are read-only, copy=False keeps them for zero-copy reads of large files
+    df = table.to_pandas(split_blocks=True)
+    if copy:
+        df = df.copy()
+    return df
+
+
+@fn.NodeDecorator(
+    node_id="pd.df_to_feather",
+    name="To Feather",
+    description="Writes a DataFrame to a Feather (Arrow IPC) file.",
+    outputs=[{"name": "feather"}],
+)
+def df_to_feather(
+    df: pd.DataFrame,
+    compression: Literal["uncompressed", "lz4", "zstd"] = "uncompressed",
+    with_index: bool = False,
+) -> bytes:
+    if pa is None:
+        raise ImportError("Parquet and Feather support requires the pyarrow package")
+    table = pa.Table.from_pandas(df, preserve_index=with_index)
+    sink = pa.BufferOutputStream()
+    # a single record batch keeps the columns contiguous, uncompressed they are read without a copy
+    feather.write_feather(
+        table, sink, compression=compression, chunksize=max(table.num_rows, 1)
+    )
+    return sink.getvalue().to_pybytes()
+
+
+# endregion feather
+
+
 # region array
 
 
@@ -277,6 +681,7 @@ CONVERT_SHELF = fn.Shelf(
         to_dict,
         from_dict,
         from_csv_auto,
+        from_csv_archive,
         from_csv_str,
         to_csv_str,
         to_orient_dict,
@@ -284,6 +689,10 @@ CONVERT_SHELF = fn.Shelf(
         df_from_array,
         DfFromExcelNode,
         df_to_xls,
+        df_from_parquet,
+        df_to_parquet,
+        df_from_feather,
+        df_to_feather,
     ],
     name="Convert",
     description="Conversions for DataFrames",
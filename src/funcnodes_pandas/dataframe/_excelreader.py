@@ -0,0 +1,136 @@
+from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+import hashlib
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+from io import BytesIO
+import pandas as pd
+
+
+class WorkbookCache:
+    """
+    LRU cache of opened workbooks (pd.ExcelFile) keyed by a hash of their content, so that reading
+    further sheets of the same data does not open the workbook again. Evicted workbooks are closed.
+    """
+
+    def __init__(self, max_entries: int = 4):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, pd.ExcelFile] = OrderedDict()
+        self._lock = threading.Lock()
+        # the last hashed data and its key, only kept while its workbook is cached
+        self._last_key = (None, None)
+
+    def _forget(self, key: str):
+        if self._last_key[1] == key:
+            self._last_key = (None, None)
+
+    def key(self, data: bytes) -> str:
+        last_data, last_key = self._last_key
+        # bytes are immutable, the node passes the same object for each sheet
+        if data is last_data:
+            return last_key
+        key = hashlib.blake2b(data, digest_size=16).hexdigest()
+        self._last_key = (data, key)
+        return key
+
+    def get(self, data: bytes) -> pd.ExcelFile:
+        key = self.key(data)
+        with self._lock:
+            workbook = self._entries.get(key)
+            if workbook is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return workbook
+            self.misses += 1
+
+        try:
+            workbook = pd.ExcelFile(BytesIO(data))
+        except Exception:
+            self._forget(key)
+            raise
+        with self._lock:
+            if key in self._entries:
+                # opened concurrently, keep the first one
+                workbook.close()
+                return self._entries[key]
+            self._entries[key] = workbook
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                old_key, old = self._entries.popitem(last=False)
+                self._forget(old_key)
+                evicted.append(old)
+        for old in evicted:
+            old.close()
+        return workbook
+
+    def clear(self):
+        """Closes and removes all workbooks and resets the counters."""
+        with self._lock:
+            workbooks = list(self._entries.values())
+            self._entries.clear()
+            self._last_key = (None, None)
+            self.hits = 0
+            self.misses = 0
+        for workbook in workbooks:
+            workbook.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+WORKBOOK_CACHE = WorkbookCache()
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _workbook_part(archive: zipfile.ZipFile) -> str:
+    # the workbook is the office document of the package relationships
+    try:
+        with archive.open("_rels/.rels") as f:
+            for _, element in ET.iterparse(f):
+                if _local_name(element.tag) == "Relationship" and element.get(
+                    "Type", ""
+                ).endswith("/officeDocument"):
+                    return element.get("Target").lstrip("/")
+    except KeyError:
+        pass
+    return "xl/workbook.xml"
+
+
+def _manifest_sheet_names(data: bytes) -> Optional[List[str]]:
+    try:
+        with zipfile.ZipFile(BytesIO(data)) as archive:
+            with archive.open(_workbook_part(archive)) as f:
+                names = []
+                for _, element in ET.iterparse(f):
+                    name = _local_name(element.tag)
+                    if name == "sheet":
+                        names.append(element.get("name"))
+                    elif name == "sheets":
+                        break
+                return names or None
+    except (KeyError, zipfile.BadZipFile, ET.ParseError):
+        return None
+
+
+def excel_sheet_names(data: bytes) -> List[str]:
+    """
+    The sheet names of a workbook. For Office Open XML workbooks (xlsx, xlsm) only the workbook
+    manifest is parsed, other formats are opened through WORKBOOK_CACHE.
+    """
+    if data[:4] == b"PK\x03\x04":
+        names = _manifest_sheet_names(data)
+        if names is not None:
+            return names
+    return WORKBOOK_CACHE.get(data).sheet_names
@@ -0,0 +1,902 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+import base64
+import json
+import threading
+import weakref
+
+import funcnodes as fn
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover
+    pa = None
+
+
+# default encoding options per render type ("table" for DataFrames, "list" for Series),
+# consumers can override them for the current context via `encoding_options`
+DEFAULT_ENCODING_OPTIONS: Dict[str, Dict[str, Any]] = {
+    "table": {
+        # "split": to_dict(orient="split"), "arrow": Arrow IPC stream bytes,
+        # "columnar": one entry per column, numeric columns as base64 encoded buffers
+        "format": "split",
+        # {"offset": int, "limit": int, "columns": list} to only encode a part of the frame,
+        # e.g. for virtualized scrolling in the frontend
+        "window": None,
+        # upper bound for the number of rows of a single window
+        "max_window_rows": 10_000,
+        # content of previews, "head": the first rows, "stats": per column summary statistics
+        "preview": "head",
+        # number of histogram bins of the "stats" preview
+        "histogram_bins": 10,
+        # object columns with at most this many distinct values are dictionary encoded
+        # in the "columnar" format (categorical columns always are), None to disable
+        "dictionary_threshold": 1_000,
+        # round floats to this many significant digits, None for full precision
+        "significant_digits": None,
+        # send floats as float32 (rounded to 7 significant digits in the "split" format)
+        "float32": False,
+        # send datetimes as int64 epoch in this unit ("s", "ms", "us" or "ns"), None for timestamps
+        "datetime_unit": None,
+        # replace NaN, NaT and infinite cells by null (0 in binary buffers) and send their positions
+        # as "nulls", "posinf" and "neginf" bitmaps
+        "sanitize": False,
+        # reuse encodings of unchanged frames from ENCODING_CACHE
+        "cache": True,
+    },
+    "list": {
+        # "values": list of the values, "columnar": index and values as columns like the "table" format
+        "format": "values",
+        "dictionary_threshold": 1_000,
+        "significant_digits": None,
+        "float32": False,
+        "datetime_unit": None,
+        # None: all values, "lttb": largest-triangle-three-buckets, "minmax": per bucket min/max
+        "decimate": None,
+        # maximal number of points of a decimated Series
+        "max_points": 2_000,
+        "cache": True,
+    },
+}
+
+_ENCODING_OPTIONS: ContextVar[Optional[Dict[str, Dict[str, Any]]]] = ContextVar(
+    "funcnodes_pandas_encoding_options", default=None
+)
+
+
+def get_encoding_options(render_type: str) -> Dict[str, Any]:
+    """Returns the effective encoding options for a render type in the current context."""
+    options = dict(DEFAULT_ENCODING_OPTIONS.get(render_type, {}))
+    overrides = _ENCODING_OPTIONS.get()
+    if overrides:
+        options.update(overrides.get(render_type, {}))
+    return options
+
+
+@contextmanager
+def encoding_options(render_type: str, **options):
+    """
+    Overrides the encoding options of a render type for the current context,
+    e.g. for a consumer that can handle Arrow IPC payloads:
+
+    >>> with encoding_options("table", format="arrow"):
+    ...     data = fn.JSONEncoder.apply_custom_encoding(df)
+    """
+    current = dict(_ENCODING_OPTIONS.get() or {})
+    current[render_type] = {**current.get(render_type, {}), **options}
+    token = _ENCODING_OPTIONS.set(current)
+    try:
+        yield
+    finally:
+        _ENCODING_OPTIONS.reset(token)
+
+
+def df_to_arrow_ipc(df: pd.DataFrame) -> bytes:
+    """Serializes a DataFrame (including its index) into Arrow IPC stream bytes."""
+    if pa is None:
+        raise ImportError("pyarrow is required for the arrow encoding")
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def arrow_ipc_to_df(data: bytes) -> pd.DataFrame:
+    """Reads Arrow IPC stream bytes back into a DataFrame."""
+    if pa is None:
+        raise ImportError("pyarrow is required for the arrow encoding")
+    with pa.ipc.open_stream(pa.py_buffer(data)) as reader:
+        return reader.read_all().to_pandas()
+
+
+def df_window(
+    df: pd.DataFrame,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    columns: Optional[List[Any]] = None,
+) -> pd.DataFrame:
+    """
+    Returns a row/column window of a DataFrame. Rows are sliced before the columns are selected,
+    so the cost scales with the size of the window and not with the size of the frame.
+    """
+    offset = max(0, int(offset))
+    stop = None if limit is None else offset + max(0, int(limit))
+    window = df.iloc[offset:stop]
+    if columns is not None:
+        window = window.loc[:, list(columns)]
+    return window
+
+
+# number of hashes the distinct count estimate is based on
+DISTINCT_SAMPLE_SIZE = 65_536
+
+
+def estimate_distinct(ser: pd.Series) -> Optional[int]:
+    """
+    Estimates the number of distinct non null values of a Series. Up to DISTINCT_SAMPLE_SIZE values are
+    counted exactly, larger Series are estimated from the values whose hash falls below a threshold,
+    which keeps all or none of the duplicates of a value in the sample.
+    """
+    ser = ser.dropna()
+    try:
+        hashes = pd.util.hash_pandas_object(ser, index=False).to_numpy()
+    except TypeError:
+        return None
+    n = len(hashes)
+    if n <= DISTINCT_SAMPLE_SIZE:
+        return int(np.unique(hashes).size)
+    fraction = DISTINCT_SAMPLE_SIZE / n
+    sampled = np.unique(hashes[hashes < np.uint64(int(fraction * 2**64))])
+    return int(round(sampled.size / fraction))
+
+
+def df_summary_stats(df: pd.DataFrame, bins: int = 10) -> List[Dict[str, Any]]:
+    """
+    Per column summary statistics: dtype, null count, min, max, mean, distinct estimate and, for numeric
+    columns, a histogram. The reductions run column wise over the numeric and datetime blocks of the frame.
+    """
+    # reductions are labelled by column position, labels can be duplicated
+    positional = df.copy(deep=False)
+    positional.columns = pd.RangeIndex(df.shape[1])
+    nulls = positional.isna().sum()
+    numeric = positional.select_dtypes(include="number", exclude="bool")
+    ordered = positional.select_dtypes(include=["number", "datetime", "datetimetz"])
+    mins = ordered.min()
+    maxs = ordered.max()
+    means = numeric.mean()
+
+    stats = []
+    for i, name in enumerate(df.columns):
+        col = df.iloc[:, i]
+        colstats = {
+            "column": name,
+            "dtype": str(col.dtype),
+            "nulls": int(nulls.iloc[i]),
+            "min": mins.get(i),
+            "max": maxs.get(i),
+            "mean": means.get(i),
+            "distinct": estimate_distinct(col),
+            "histogram": None,
+        }
+        if i in numeric.columns:
+            values = col.to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[np.isfinite(values)]
+            if len(values) > 0:
+                counts, edges = np.histogram(values, bins=bins)
+                colstats["histogram"] = {
+                    "counts": counts.tolist(),
+                    "edges": edges.tolist(),
+                }
+        for key in ("min", "max", "mean"):
+            if isinstance(colstats[key], np.generic):
+                colstats[key] = colstats[key].item()
+            # all missing columns reduce to NaN, NaT or NA
+            if colstats[key] is not None and pd.isna(colstats[key]):
+                colstats[key] = None
+        stats.append(colstats)
+    return stats
+
+
+def _encode_buffer(arr: np.ndarray) -> Dict[str, Any]:
+    arr = np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder("<"))
+    return {
+        "dtype": arr.dtype.str,
+        "data": base64.b64encode(arr.tobytes()).decode("utf-8"),
+    }
+
+
+def _min_int_dtype(n: int) -> np.dtype:
+    for dtype in (np.int8, np.int16, np.int32):
+        if n <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _encode_dictionary(
+    codes: np.ndarray, categories: pd.Index, ordered: bool = False
+) -> Dict[str, Any]:
+    return {
+        "dtype": "category",
+        "codes": _encode_buffer(codes.astype(_min_int_dtype(len(categories)))),
+        "categories": encode_column(categories),
+        "ordered": ordered,
+    }
+
+
+def encode_column(
+    values: Union[pd.Series, pd.Index], dictionary_threshold: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Encodes the values of a column, numeric, bool and datetime values as base64 encoded raw
+    little-endian buffer with a numpy dtype tag (e.g. "<f8", "|b1", "<M8[ns]"), a RangeIndex by its
+    start, stop and step and all others as list.
+    If dictionary_threshold is given, categorical values and object values with at most
+    dictionary_threshold distinct values are encoded as "codes" buffer (-1 for missing values)
+    and list of "categories".
+    """
+    if isinstance(values, pd.RangeIndex):
+        return {
+            "dtype": "range",
+            "start": values.start,
+            "stop": values.stop,
+            "step": values.step,
+        }
+    dtype = values.dtype
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        # timezone aware values are sent as UTC
+        utc = (
+            values.dt.tz_convert(None)
+            if isinstance(values, pd.Series)
+            else values.tz_convert(None)
+        )
+        return {**encode_column(utc), "tz": str(dtype.tz)}
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufmM":
+        return _encode_buffer(values.to_numpy())
+    if dictionary_threshold is not None:
+        if isinstance(dtype, pd.CategoricalDtype):
+            cat = pd.Categorical(values)
+            return _encode_dictionary(cat.codes, cat.categories, cat.ordered)
+        if pd.api.types.is_object_dtype(dtype) or isinstance(dtype, pd.StringDtype):
+            codes, uniques = pd.factorize(values, use_na_sentinel=True)
+            # only worth it if values repeat
+            if len(uniques) <= dictionary_threshold and len(uniques) < len(values) / 2:
+                return _encode_dictionary(codes, pd.Index(uniques))
+    arr = values.to_numpy(dtype=object)
+    arr[pd.isna(arr)] = None
+    return {"dtype": str(dtype), "data": arr.tolist()}
+
+
+def encode_columnar(
+    df: pd.DataFrame, dictionary_threshold: Optional[int] = None
+) -> Dict[str, Any]:
+    """Columnar encoding of a DataFrame, see encode_column."""
+    return {
+        "format": "columnar",
+        "columns": df.columns.tolist(),
+        "index": encode_column(df.index, dictionary_threshold=dictionary_threshold),
+        "data": [
+            encode_column(df.iloc[:, i], dictionary_threshold=dictionary_threshold)
+            for i in range(len(df.columns))
+        ],
+    }
+
+
+def _encode_arrow(df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+    if pa is None:
+        return None
+    try:
+        return {"format": "arrow", "data": df_to_arrow_ipc(df)}
+    except (pa.ArrowException, TypeError, ValueError):
+        # e.g. mixed type object columns, fall back to the default encoding
+        return None
+
+
+def encode_dataframe(df: pd.DataFrame, preview: bool = False) -> Any:
+    """Encodes a DataFrame according to the "table" encoding options."""
+    options = get_encoding_options("table")
+    shape = None
+    window = options.get("window")
+    if window is not None:
+        offset = window.get("offset", 0)
+        limit = window.get("limit")
+        if limit is None or limit > options["max_window_rows"]:
+            limit = options["max_window_rows"]
+        shape = {
+            "offset": offset,
+            "total_rows": len(df),
+            "total_columns": len(df.columns),
+        }
+        df = df_window(df, offset=offset, limit=limit, columns=window.get("columns"))
+    elif preview:
+        shape = {"offset": 0, "total_rows": len(df), "total_columns": len(df.columns)}
+        if options.get("preview") == "stats":
+            data = {
+                "format": "stats",
+                "stats": df_summary_stats(df, bins=options["histogram_bins"]),
+            }
+            data.update(shape)
+            return data
+        df = df.head()
+
+    data = _encode_frame(df, options)
+    if shape is not None:
+        data.update(shape)
+    return data
+
+
+def round_significant(values: np.ndarray, digits: int) -> np.ndarray:
+    """Rounds floats to the given number of significant digits."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        magnitude = np.floor(np.log10(np.abs(values)))
+    magnitude = np.where(np.isfinite(magnitude), magnitude, 0)
+    exponent = digits - 1 - magnitude
+    # dividing by an exact power of ten keeps the shortest repr of the rounded values
+    with np.errstate(over="ignore", invalid="ignore"):
+        return np.where(
+            exponent >= 0,
+            np.round(values * 10.0**exponent) / 10.0**exponent,
+            np.round(values / 10.0**-exponent) * 10.0**-exponent,
+        )
+
+
+def to_epoch(values: Union[pd.Series, pd.Index], unit: str) -> np.ndarray:
+    """Converts datetime values to int64 epoch values in the given unit, NaT becomes the int64 minimum."""
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        values = (
+            values.dt.tz_convert(None)
+            if isinstance(values, pd.Series)
+            else values.tz_convert(None)
+        )
+    return values.to_numpy().astype(f"datetime64[{unit}]").view(np.int64)
+
+
+def prepare_values(
+    values: pd.Series, options: Dict[str, Any], binary: bool
+) -> Tuple[pd.Series, Optional[str]]:
+    """
+    Applies the precision and datetime options to a column before it is serialized.
+    binary is True for formats that keep the numpy dtype (e.g. "columnar"). Returns the prepared
+    column and the epoch unit if datetimes were converted.
+    """
+    dtype = values.dtype
+    digits = options.get("significant_digits")
+    float32 = options.get("float32")
+    unit = options.get("datetime_unit")
+    if isinstance(dtype, np.dtype) and dtype.kind == "f" and (digits or float32):
+        arr = values.to_numpy()
+        if digits:
+            arr = round_significant(arr, digits)
+        if float32:
+            if binary:
+                arr = arr.astype(np.float32)
+            elif not digits or digits > 7:
+                # the repr of float32 values cast to python floats is longer than the original one
+                arr = round_significant(arr, 7)
+        return pd.Series(arr, index=values.index, name=values.name), None
+    if unit and _is_datetime(dtype):
+        arr = to_epoch(values, unit)
+        if not binary:
+            nat = values.isna().to_numpy()
+            if nat.any():
+                arr = arr.astype(object)
+                arr[nat] = None
+        return pd.Series(arr, index=values.index, name=values.name), unit
+    return values, None
+
+
+def _prepare_frame(
+    df: pd.DataFrame, options: Dict[str, Any], binary: bool
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    if not (
+        options.get("significant_digits")
+        or options.get("float32")
+        or options.get("datetime_unit")
+    ):
+        return df, {}
+    prepared = None
+    epoch_columns = []
+    for i in range(len(df.columns)):
+        col = df.iloc[:, i]
+        values, unit = prepare_values(col, options, binary=binary)
+        if values is col:
+            continue
+        if prepared is None:
+            prepared = df.copy(deep=False)
+        prepared.isetitem(i, values)
+        if unit is not None:
+            epoch_columns.append(i)
+
+    meta = {}
+    if isinstance(df.index, pd.DatetimeIndex) and options.get("datetime_unit"):
+        index, unit = prepare_values(df.index.to_series(), options, binary=binary)
+        if prepared is None:
+            prepared = df.copy(deep=False)
+        prepared.index = pd.Index(index.to_numpy(), name=df.index.name)
+        meta["epoch_index"] = True
+    if epoch_columns:
+        meta["epoch_columns"] = epoch_columns
+    if meta:
+        meta["datetime_unit"] = options["datetime_unit"]
+    return (df if prepared is None else prepared), meta
+
+
+def encode_bitmap(mask: np.ndarray) -> str:
+    """Base64 encoded bitmap of a boolean mask, least significant bit first."""
+    return base64.b64encode(np.packbits(mask, bitorder="little").tobytes()).decode(
+        "utf-8"
+    )
+
+
+def _sanitize_frame(
+    df: pd.DataFrame, binary: bool
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    # one vectorized isna per column, only columns with missing or infinite values are touched
+    isna = df.isna().to_numpy()
+    n_columns = len(df.columns)
+    nulls: List[Optional[str]] = [None] * n_columns
+    posinf: List[Optional[str]] = [None] * n_columns
+    neginf: List[Optional[str]] = [None] * n_columns
+    prepared = None
+    for i in range(n_columns):
+        col = df.iloc[:, i]
+        missing = isna[:, i]
+        dtype = col.dtype
+        infinite = None
+        if isinstance(dtype, np.dtype) and dtype.kind == "f":
+            arr = col.to_numpy()
+            pinf, ninf = arr == np.inf, arr == -np.inf
+            if pinf.any():
+                posinf[i] = encode_bitmap(pinf)
+            if ninf.any():
+                neginf[i] = encode_bitmap(ninf)
+            infinite = pinf | ninf
+        if not missing.any() and (infinite is None or not infinite.any()):
+            continue
+        if missing.any():
+            nulls[i] = encode_bitmap(missing)
+        invalid = missing if infinite is None else missing | infinite
+
+        if binary and isinstance(dtype, np.dtype) and dtype.kind in "fmM":
+            arr = col.to_numpy().copy()
+            arr[invalid] = 0 if dtype.kind == "f" else np.datetime64(0, "ns")
+        elif binary and not (isinstance(dtype, np.dtype) and dtype.kind in "biu"):
+            # lists and dictionary codes handle missing values themselves
+            continue
+        else:
+            arr = col.to_numpy(dtype=object)
+            arr[invalid] = None
+        if prepared is None:
+            prepared = df.copy(deep=False)
+        prepared.isetitem(
+            i, pd.Series(arr, index=col.index, name=col.name, dtype=arr.dtype)
+        )
+
+    meta = {}
+    for key, bitmaps in (("nulls", nulls), ("posinf", posinf), ("neginf", neginf)):
+        if any(b is not None for b in bitmaps):
+            meta[key] = bitmaps
+    return (df if prepared is None else prepared), meta
+
+
+def _encode_frame(df: pd.DataFrame, options: Dict[str, Any]) -> Dict[str, Any]:
+    binary = options.get("format") != "split"
+    df, meta = _prepare_frame(df, options, binary=binary)
+    # arrow has its own validity bitmaps
+    if options.get("sanitize") and options.get("format") != "arrow":
+        df, null_meta = _sanitize_frame(df, binary=binary)
+        meta.update(null_meta)
+    data = None
+    if options.get("format") == "arrow":
+        data = _encode_arrow(df)
+    elif options.get("format") == "columnar":
+        data = encode_columnar(
+            df, dictionary_threshold=options.get("dictionary_threshold")
+        )
+    if data is None:
+        data = df.to_dict(orient="split")
+    data.update(meta)
+    return data
+
+
+def iter_encode_dataframe(
+    df: pd.DataFrame, chunksize: int = 10_000
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields JSON-ready encodings of consecutive row chunks of a DataFrame in the format of the "table"
+    encoding options. Only one chunk is converted at a time, so the peak memory is bounded by the
+    chunksize and the first chunk can be sent before the rest of the frame is converted.
+    Each chunk carries its "offset", "total_rows" and whether it is the "last" one.
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be a positive integer")
+    options = get_encoding_options("table")
+    total_rows = len(df)
+    offset = 0
+    while True:
+        data = _encode_frame(df.iloc[offset : offset + chunksize], options)
+        data.update(
+            {
+                "offset": offset,
+                "total_rows": total_rows,
+                "last": offset + chunksize >= total_rows,
+            }
+        )
+        yield fn.JSONEncoder.apply_custom_encoding(data)
+        offset += chunksize
+        if offset >= total_rows:
+            break
+
+
+def encode_window(
+    df: pd.DataFrame,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    columns: Optional[List[Any]] = None,
+) -> Any:
+    """JSON-ready encoding of a window of a DataFrame, e.g. for a paged "table" request of the frontend."""
+    window = {"offset": offset, "columns": columns}
+    if limit is not None:
+        window["limit"] = limit
+    with encoding_options("table", window=window):
+        return fn.JSONEncoder.apply_custom_encoding(df)
+
+
+def encode_io_value(node: fn.Node, ioid: str, preview: bool = False, **options) -> Any:
+    """
+    JSON-ready encoding of the value of an input or output of a node with encoding options for this
+    request, the "table" options for a DataFrame and the "list" options for a Series, e.g. a window:
+
+    >>> encode_io_value(node, "df", window={"offset": 10_000, "limit": 100})
+
+    The worker's get_io_value and get_io_full_value do not take options, a worker exposes this
+    function to let the frontend request windows, formats or decimation of a single io.
+    """
+    value = node.get_input_or_output(ioid).value
+    if isinstance(value, pd.DataFrame):
+        render_type = "table"
+    elif isinstance(value, pd.Series):
+        render_type = "list"
+    else:
+        return fn.JSONEncoder.apply_custom_encoding(value, preview=preview)
+    with encoding_options(render_type, **options):
+        return fn.JSONEncoder.apply_custom_encoding(value, preview=preview)
+
+
+def _series_x(ser: pd.Series) -> np.ndarray:
+    # numeric and datetime like indices are used as x values, everything else by position
+    index = ser.index
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(np.float64)
+    if pd.api.types.is_numeric_dtype(index.dtype) and not pd.api.types.is_bool_dtype(
+        index.dtype
+    ):
+        return index.to_numpy(dtype=np.float64)
+    return np.arange(len(index), dtype=np.float64)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Positions of the points selected by the largest-triangle-three-buckets algorithm."""
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:n_out], dtype=np.intp)
+
+    # the first and last point are always kept, the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    starts, stops = edges[:-1], edges[1:]
+    counts = stops - starts
+    mean_x = np.add.reduceat(x[1 : n - 1], starts - 1) / counts
+    mean_y = np.add.reduceat(y[1 : n - 1], starts - 1) / counts
+    # the third point of the triangle is the mean of the next bucket (the last point for the last bucket)
+    next_x = np.append(mean_x[1:], x[n - 1])
+    next_y = np.append(mean_y[1:], y[n - 1])
+
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        bx = x[starts[i] : stops[i]]
+        by = y[starts[i] : stops[i]]
+        areas = np.abs(
+            (x[a] - next_x[i]) * (by - y[a]) - (x[a] - bx) * (next_y[i] - y[a])
+        )
+        a = starts[i] + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Positions of the minimum and maximum of n_out // 2 equally sized buckets."""
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    n_buckets = max(1, n_out // 2)
+    starts = np.linspace(0, n, n_buckets + 1).astype(np.intp)[:-1]
+    counts = np.diff(np.append(starts, n))
+    bucket = np.repeat(np.arange(n_buckets), counts)
+
+    def first_match(values):
+        idx = np.flatnonzero(y == np.repeat(values, counts))
+        _, first = np.unique(bucket[idx], return_index=True)
+        return idx[first]
+
+    mins = first_match(np.fmin.reduceat(y, starts))
+    maxs = first_match(np.fmax.reduceat(y, starts))
+    return np.unique(np.concatenate([mins, maxs]))
+
+
+def decimate_series(ser: pd.Series, max_points: int, method: str = "lttb") -> pd.Series:
+    """
+    Reduces a numeric Series to at most max_points points, keeping the original index values.
+    Missing values are dropped, non numeric Series are returned unchanged.
+    """
+    if len(ser) <= max_points or not pd.api.types.is_numeric_dtype(ser.dtype):
+        return ser
+    ser = ser.dropna()
+    y = ser.to_numpy(dtype=np.float64)
+    if method == "lttb":
+        positions = lttb_indices(_series_x(ser), y, max_points)
+    elif method == "minmax":
+        positions = minmax_indices(y, max_points)
+    else:
+        raise ValueError(f"Unknown decimation method: {method}")
+    return ser.iloc[positions]
+
+
+def _is_datetime(dtype) -> bool:
+    return isinstance(dtype, pd.DatetimeTZDtype) or (
+        isinstance(dtype, np.dtype) and dtype.kind == "M"
+    )
+
+
+def encode_series(ser: pd.Series, preview: bool = False) -> Any:
+    """
+    Encodes a Series according to the "list" encoding options. Dict payloads are complete and not cut
+    by the generic preview, a decimated preview keeps its max_points points, other dict previews
+    the first rows of the Series like DataFrame previews.
+    """
+    options = get_encoding_options("list")
+    columnar = options.get("format") == "columnar"
+    dictionary_threshold = options.get("dictionary_threshold")
+    info = {}
+    method = options.get("decimate")
+    if method is not None and len(ser) > options["max_points"]:
+        decimated = decimate_series(ser, options["max_points"], method=method)
+        if decimated is not ser:
+            info = {"length": len(ser), "decimate": method}
+            ser = decimated
+
+    if (
+        preview
+        and not info
+        and (columnar or (options.get("datetime_unit") and _is_datetime(ser.dtype)))
+    ):
+        head = ser.head()
+        if len(head) < len(ser):
+            info = {"length": len(ser)}
+            ser = head
+    values, unit = prepare_values(ser, options, binary=columnar)
+    if unit is not None:
+        info["datetime_unit"] = unit
+
+    if columnar:
+        return {
+            "format": "columnar",
+            "name": ser.name,
+            "index": encode_column(
+                ser.index, dictionary_threshold=dictionary_threshold
+            ),
+            "values": encode_column(values, dictionary_threshold=dictionary_threshold),
+            **info,
+        }
+    if info:
+        return {"index": ser.index.tolist(), "values": values.values, **info}
+    return values.values
+
+
+# region cache
+
+
+def fingerprint(obj: Any) -> Optional[int]:
+    """
+    Content fingerprint of a DataFrame or Series from its shape, labels, dtypes and a hash of all its
+    rows, so in-place edits of any cell change it. Returns None if the content cannot be hashed.
+    """
+    try:
+        content = pd.util.hash_pandas_object(obj, index=True)
+    except TypeError:
+        return None
+    if isinstance(obj, pd.DataFrame):
+        labels = (tuple(obj.columns), tuple(str(dt) for dt in obj.dtypes))
+    else:
+        labels = (obj.name, str(obj.dtype))
+    try:
+        return hash((obj.shape, labels, content.to_numpy().tobytes()))
+    except TypeError:
+        return None
+
+
+# number of evenly spaced items of a list the size estimate of an encoding is based on
+SIZE_SAMPLE_ITEMS = 16
+
+
+def estimate_nbytes(data: Any) -> int:
+    """
+    Estimates the serialized size of a JSON-ready encoding without serializing it: strings and bytes
+    count their length, other scalars the length of their repr and lists are extrapolated from
+    SIZE_SAMPLE_ITEMS evenly spaced items.
+    """
+    if isinstance(data, (str, bytes)):
+        return len(data) + 2
+    if isinstance(data, dict):
+        return 2 + sum(
+            estimate_nbytes(k) + estimate_nbytes(v) + 2 for k, v in data.items()
+        )
+    if isinstance(data, (list, tuple)):
+        n = len(data)
+        if n == 0:
+            return 2
+        sample = data[:: max(1, n // SIZE_SAMPLE_ITEMS)]
+        return 2 + int(
+            sum(estimate_nbytes(item) + 1 for item in sample) * n / len(sample)
+        )
+    if isinstance(data, np.ndarray):
+        return data.nbytes
+    return len(str(data))
+
+
+class EncodingCache:
+    """
+    LRU cache of JSON-ready encodings, bounded by the estimated serialized size of the cached encodings.
+    Entries are keyed by the identity of the encoded object and removed when that object is garbage collected.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, Tuple[weakref.ref, Any, int]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        # entries of collected objects whose removal is left to the next locked operation
+        self._collected: List[Tuple[Hashable, weakref.ref]] = []
+
+    def _remove(self, key: Hashable, ref: weakref.ref):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is ref:
+            del self._entries[key]
+            self.nbytes -= entry[2]
+
+    def _purge(self):
+        while self._collected:
+            self._remove(*self._collected.pop())
+
+    def _on_collect(self, key: Hashable, ref: weakref.ref):
+        # the garbage collector can run while this thread holds the lock, never wait for it
+        if not self._lock.acquire(blocking=False):
+            self._collected.append((key, ref))
+            return
+        try:
+            self._remove(key, ref)
+        finally:
+            self._lock.release()
+
+    def get(self, key: Hashable, obj: Any) -> Tuple[Any, bool]:
+        with self._lock:
+            self._purge()
+            entry = self._entries.get(key)
+            if entry is None or entry[0]() is not obj:
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], True
+
+    def put(self, key: Hashable, obj: Any, value: Any, nbytes: int):
+        if nbytes > self.max_bytes:
+            return
+        ref = weakref.ref(obj, lambda ref: self._on_collect(key, ref))
+        with self._lock:
+            self._purge()
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[2]
+            self._entries[key] = (ref, value, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                _, (_, _, size) = self._entries.popitem(last=False)
+                self.nbytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._collected.clear()
+            self._entries.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._purge()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "nbytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+ENCODING_CACHE = EncodingCache()
+
+
+def encoding_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters and size of the shared encoding cache."""
+    return ENCODING_CACHE.stats()
+
+
+_ENCODERS: Dict[str, Tuple[Callable[[Any, bool], Any], Optional[bool]]] = {
+    # render type: (encoder, preview of the nested encoding, None to keep the preview flag for
+    # plain values, dict payloads are limited by the encoder and never cut by the preview)
+    "table": (encode_dataframe, False),
+    "list": (encode_series, None),
+}
+
+
+def cached_encoding(obj: Any, render_type: str, preview: bool = False) -> Any:
+    """
+    JSON-ready encoding of obj with the encoder of the render type. Repeated encodings of an unchanged
+    object with the same options are served from ENCODING_CACHE.
+    """
+    encoder, continue_preview = _ENCODERS[render_type]
+    options = get_encoding_options(render_type)
+
+    def _encode():
+        data = encoder(obj, preview=preview)
+        nested = preview if continue_preview is None else continue_preview
+        # e.g. base64 buffers or decimated points, cutting them would corrupt the payload
+        if isinstance(data, dict):
+            nested = False
+        return fn.JSONEncoder.apply_custom_encoding(data, preview=nested)
+
+    if not options.get("cache"):
+        return _encode()
+    fp = fingerprint(obj)
+    if fp is None:
+        return _encode()
+
+    key = (
+        id(obj),
+        fp,
+        render_type,
+        preview,
+        json.dumps(options, sort_keys=True, default=str),
+    )
+    data, hit = ENCODING_CACHE.get(key, obj)
+    if hit:
+        return data
+    data = _encode()
+    ENCODING_CACHE.put(key, obj, data, estimate_nbytes(data))
+    return data
+
+
+# endregion cache
@@ -0,0 +1,150 @@
+"""
+Generated CSV corpus for the autoreader: each case is a file with known reading parameters,
+varying the separator, decimal and thousands separators, the number of metadata lines before
+the header, the encoding, the width and the number of rows.
+"""
+
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class CorpusCase:
+    sep: str = ","
+    decimal: str = "."
+    thousands: Optional[str] = None
+    metadata_lines: int = 0
+    encoding: str = "utf-8"
+    columns: int = 6
+    rows: int = 200
+    seed: int = 0
+
+    @property
+    def name(self) -> str:
+        return (
+            f"sep={self.sep!r} decimal={self.decimal!r} thousands={self.thousands!r} "
+            f"metadata={self.metadata_lines} encoding={self.encoding} "
+            f"{self.rows}x{self.columns}"
+        )
+
+    def frame(self) -> pd.DataFrame:
+        """The table the case encodes, with int, float and text columns in turn."""
+        rng = np.random.default_rng(self.seed)
+        data = {}
+        for i in range(self.columns):
+            kind = i % 3
+            if kind == 0:
+                values = rng.integers(-5_000_000, 5_000_000, self.rows)
+            elif kind == 1:
+                values = np.round(rng.normal(scale=10_000, size=self.rows), 3)
+            else:
+                values = rng.choice(["alpha", "beta", "gamma äö"], self.rows)
+            data[f"col {i}"] = values
+        return pd.DataFrame(data)
+
+    def text(self) -> str:
+        df = self.frame()
+        columns = []
+        for name in df.columns:
+            values = df[name]
+            if values.dtype.kind == "i":
+                pattern = "{:,d}" if self.thousands else "{:d}"
+            elif values.dtype.kind == "f":
+                pattern = "{:,.3f}" if self.thousands else "{:.3f}"
+            else:
+                columns.append(values.tolist())
+                continue
+            formatted = []
+            for value in values.tolist():
+                text = pattern.format(value)
+                # swap the separators through a placeholder, "," and "." may be exchanged
+                text = text.replace(",", "\0").replace(".", self.decimal)
+                formatted.append(text.replace("\0", self.thousands or ""))
+            columns.append(formatted)
+        lines = [f"meta {i}: value {i}" for i in range(self.metadata_lines)]
+        lines.append(self.sep.join(df.columns))
+        lines.extend(self.sep.join(row) for row in zip(*columns))
+        return "\n".join(lines) + "\n"
+
+    def data(self) -> bytes:
+        return self.text().encode(self.encoding)
+
+
+def _valid(case: CorpusCase) -> bool:
+    separators = [case.sep, case.decimal]
+    if case.thousands is not None:
+        separators.append(case.thousands)
+    return len(set(separators)) == len(separators)
+
+
+BASE_CASE = CorpusCase()
+
+VARIANTS = {
+    "sep": [",", ";", "\t", "|"],
+    "decimal": [".", ","],
+    "thousands": [None, ",", ".", " "],
+    "metadata_lines": [0, 1, 3],
+    "encoding": ["utf-8", "utf-8-sig", "latin-1", "utf-16"],
+    "columns": [2, 6, 30],
+    "rows": [20, 200, 5_000],
+}
+
+
+def generate_corpus(mixed: int = 24, seed: int = 0) -> List[CorpusCase]:
+    """
+    The base case varied in one dimension at a time, followed by mixed random combinations of
+    all dimensions. Combinations that reuse a separator are skipped.
+    """
+    cases = []
+    for key, values in VARIANTS.items():
+        for value in values:
+            for base in (BASE_CASE, replace(BASE_CASE, sep=";", decimal=",")):
+                case = replace(base, **{key: value})
+                if _valid(case) and case not in cases:
+                    cases.append(case)
+
+    rng = np.random.default_rng(seed)
+    while mixed > 0:
+        case = CorpusCase(
+            **{
+                key: values[rng.integers(len(values))]
+                for key, values in VARIANTS.items()
+            },
+            seed=int(rng.integers(1 << 16)),
+        )
+        if _valid(case) and case not in cases:
+            cases.append(case)
+            mixed -= 1
+    return cases
+
+
+def parameter_errors(
+    case: CorpusCase, df: pd.DataFrame, params: Dict[str, Any]
+) -> List[str]:
+    """The detected parameters and values of a case that differ from the generated ones."""
+    errors = []
+    expected = {
+        "sep": case.sep,
+        "decimal": case.decimal,
+        "thousands": case.thousands,
+        "skiprows": case.metadata_lines,
+    }
+    for key, value in expected.items():
+        if params.get(key) != value:
+            errors.append(f"{key}: {params.get(key)!r} != {value!r}")
+    encoding = params.get("encoding")
+    if encoding is not None:
+        try:
+            decoded = case.data().decode(encoding)
+        except UnicodeDecodeError:
+            decoded = None
+        if decoded is None or decoded.lstrip("\ufeff") != case.text():
+            errors.append(f"encoding: {encoding!r} != {case.encoding!r}")
+    try:
+        pd.testing.assert_frame_equal(df, case.frame(), check_dtype=False)
+    except AssertionError:
+        errors.append("values differ")
+    return errors
@@ -4,6 +4,7 @@ import pandas as pd
 import funcnodes as fn
 import numpy as np
 from funcnodes_core import testing
+from funcnodes_pandas.dataframe._convert import pa
 
 
 class TestDataframeConvert(unittest.IsolatedAsyncioTestCase):
@@ -72,6 +73,123 @@ class TestDataframeConvert(unittest.IsolatedAsyncioTestCase):
         await ins
         pd.testing.assert_frame_equal(ins.outputs["df"].value, self.df)
 
+    async def test_from_csv_str_engine(self):
+        ins = fnpd.from_csv_str()
+        ins.inputs["source"].value = self.df.to_csv(index=False).encode("utf-8")
+        for engine in ["c", "pyarrow", "python"]:
+            ins.inputs["engine"].value = engine
+            await ins
+            pd.testing.assert_frame_equal(ins.outputs["df"].value, self.df)
+
+    async def test_from_csv_str_projection(self):
+        ins = fnpd.from_csv_str()
+        text = "A,B,C,D\n1,x,2020-01-01,-\n2,y,2020-01-02,4\n3,z,2020-01-03,5\n"
+        ins.inputs["source"].value = text.encode("utf-8")
+        self.assertEqual(
+            ins.inputs["usecols"].value_options["options"], ["A", "B", "C", "D"]
+        )
+        ins.inputs["usecols"].value = ["A", "C", "D"]
+        ins.inputs["nrows"].value = 2
+        ins.inputs["dtype"].value = {"A": "int16"}
+        ins.inputs["parse_dates"].value = ["C"]
+        ins.inputs["na_values"].value = ["-"]
+        ins.inputs["low_memory"].value = False
+        for engine in [None, "c", "pyarrow", "python"]:
+            ins.inputs["engine"].value = engine
+            await ins
+            df = ins.outputs["df"].value
+            self.assertEqual(list(df.columns), ["A", "C", "D"])
+            self.assertEqual(len(df), 2)
+            self.assertEqual(df["A"].dtype, np.int16)
+            self.assertTrue(pd.api.types.is_datetime64_any_dtype(df["C"]))
+            self.assertTrue(np.isnan(df["D"].iloc[0]))
+
+        # a picked option is a single column name
+        ins.inputs["usecols"].value = ins.inputs["usecols"].value_options["options"][0]
+        ins.inputs["dtype"].value = None
+        ins.inputs["parse_dates"].value = None
+        ins.inputs["na_values"].value = None
+        for engine in [None, "c", "pyarrow", "python"]:
+            ins.inputs["engine"].value = engine
+            await ins
+            self.assertEqual(list(ins.outputs["df"].value.columns), ["A"])
+
+    async def test_from_csv_str_compressed(self):
+        import gzip
+
+        ins = fnpd.from_csv_str()
+        ins.inputs["source"].value = gzip.compress(
+            self.df.to_csv(index=False).encode("utf-8")
+        )
+        self.assertEqual(
+            ins.inputs["usecols"].value_options["options"], ["A", "B", "C"]
+        )
+        await ins
+        pd.testing.assert_frame_equal(ins.outputs["df"].value, self.df)
+
+    async def test_from_csv_archive(self):
+        import zipfile
+        from io import BytesIO
+
+        data = BytesIO()
+        with zipfile.ZipFile(data, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("a.csv", self.df.to_csv(index=False))
+            archive.writestr("b.csv", self.df.to_csv(index=False, sep=";", decimal=","))
+        ins = fnpd.from_csv_archive()
+        ins.inputs["source"].value = data.getvalue()
+        ins.inputs["concat"].value = True
+        await ins
+        frames = ins.outputs["frames"].value
+        self.assertEqual(list(frames), ["a.csv", "b.csv"])
+        for df in frames.values():
+            pd.testing.assert_frame_equal(df, self.df)
+        self.assertEqual(ins.outputs["params"].value["b.csv"]["sep"], ";")
+        pd.testing.assert_frame_equal(
+            ins.outputs["df"].value.loc["b.csv"], self.df, check_names=False
+        )
+
+    async def test_from_csv_str_path(self):
+        import tempfile
+        from pathlib import Path
+
+        ins = fnpd.from_csv_str()
+        ins.inputs["source_is_path"].value = True
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "data.csv"
+            path.write_bytes(self.df.to_csv(index=False).encode("utf-8"))
+            ins.inputs["source"].value = str(path)
+            self.assertEqual(
+                ins.inputs["usecols"].value_options["options"], ["A", "B", "C"]
+            )
+            for engine in [None, "pyarrow"]:
+                ins.inputs["engine"].value = engine
+                ins.inputs["source"].value = str(path)
+                await ins
+                pd.testing.assert_frame_equal(ins.outputs["df"].value, self.df)
+                with open(path, "rb") as handle:
+                    ins.inputs["source"].value = handle
+                    await ins
+                pd.testing.assert_frame_equal(ins.outputs["df"].value, self.df)
+
+    async def test_from_csv_auto_path(self):
+        import tempfile
+        from pathlib import Path
+
+        ins = fnpd.from_csv_auto()
+        data = self.df.to_csv(index=False, sep=";", decimal=",").encode("utf-8")
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "data.csv"
+            path.write_bytes(data)
+            ins.inputs["source"].value = str(path)
+            ins.inputs["source_is_path"].value = True
+            await ins
+            pd.testing.assert_frame_equal(ins.outputs["df"].value, self.df)
+            self.assertEqual(ins.outputs["params"].value["sep"], ";")
+
+            ins.inputs["source"].value = str(Path(directory) / "missing.csv")
+            with self.assertRaises(fn.NodeTriggerError):
+                await ins
+
     async def test_df_from_excel(self):
         ins = fnpd.DfFromExcelNode()
         toxls = fnpd.df_to_xls()
@@ -83,6 +201,196 @@ class TestDataframeConvert(unittest.IsolatedAsyncioTestCase):
         print(self.df)
         pd.testing.assert_frame_equal(ins.outputs["df"].value, self.df)
 
+    async def test_df_from_excel_sheets(self):
+        from io import BytesIO
+
+        data = fnpd.df_to_xls.o_func(self.df, sheet_name="first")
+        data = fnpd.df_to_xls.o_func(self.df * 2, sheet_name="second", exceldata=data)
+        self.assertEqual(
+            fnpd.excel_sheet_names(data), pd.ExcelFile(BytesIO(data)).sheet_names
+        )
+
+        fnpd.WORKBOOK_CACHE.clear()
+        ins = fnpd.DfFromExcelNode()
+        ins.inputs["data"].value = data
+        self.assertEqual(
+            ins.inputs["sheet"].value_options["options"], ["first", "second"]
+        )
+        # the sheets are listed from the manifest without opening the workbook
+        self.assertEqual(fnpd.WORKBOOK_CACHE.stats()["entries"], 0)
+        for sheet, expected in [("first", self.df), ("second", self.df * 2)]:
+            ins.inputs["sheet"].value = sheet
+            await ins
+            pd.testing.assert_frame_equal(ins.outputs["df"].value, expected)
+        stats = fnpd.WORKBOOK_CACHE.stats()
+        self.assertEqual((stats["misses"], stats["hits"]), (1, 1))
+        fnpd.WORKBOOK_CACHE.clear()
+
+        # the memoized data is not kept without its workbook
+        cache = fnpd.WorkbookCache(max_entries=0)
+        cache.get(data)
+        self.assertIsNone(cache._last_key[0])
+        with self.assertRaises(ValueError):
+            cache.get(b"not a workbook")
+        self.assertIsNone(cache._last_key[0])
+
+    @unittest.skipUnless(pa, "pyarrow not installed")
+    async def test_df_parquet(self):
+        from io import BytesIO
+        from funcnodes_pandas.dataframe._convert import pq
+
+        df = pd.DataFrame(
+            {"A": np.arange(100), "B": np.arange(100) / 2, "C": ["x", "y"] * 50}
+        )
+        toparquet = fnpd.df_to_parquet()
+        toparquet.inputs["df"].value = df
+        toparquet.inputs["compression"].value = "zstd"
+        toparquet.inputs["row_group_size"].value = 30
+        toparquet.inputs["use_dictionary"].value = ["C"]
+        await toparquet
+        data = toparquet.outputs["parquet"].value
+        metadata = pq.ParquetFile(BytesIO(data)).metadata
+        self.assertEqual(metadata.num_row_groups, 4)
+        self.assertEqual(metadata.row_group(0).column(0).compression, "ZSTD")
+
+        ins = fnpd.df_from_parquet()
+        ins.inputs["data"].value = data
+        self.assertEqual(
+            ins.inputs["columns"].value_options["options"], ["A", "B", "C"]
+        )
+        await ins
+        pd.testing.assert_frame_equal(ins.outputs["df"].value, df)
+
+        # a picked option is a single column name
+        named = pd.DataFrame({"ab": [1, 2], "a": [3, 4], "b": [5, 6]})
+        toparquet.inputs["df"].value = named
+        await toparquet
+        ins.inputs["data"].value = toparquet.outputs["parquet"].value
+        ins.inputs["columns"].value = ins.inputs["columns"].value_options["options"][0]
+        await ins
+        pd.testing.assert_frame_equal(ins.outputs["df"].value, named[["ab"]])
+        batches = fnpd.iter_parquet_batches(
+            toparquet.outputs["parquet"].value, columns="ab"
+        )
+        pd.testing.assert_frame_equal(pd.concat(batches), named[["ab"]])
+        ins.inputs["data"].value = data
+
+        ins.inputs["columns"].value = ["A", "C"]
+        ins.inputs["filters"].value = [["A", ">=", 50], ["C", "==", "x"]]
+        await ins
+        expected = df.loc[(df["A"] >= 50) & (df["C"] == "x"), ["A", "C"]]
+        pd.testing.assert_frame_equal(
+            ins.outputs["df"].value, expected.reset_index(drop=True)
+        )
+
+        ins.inputs["row_groups"].value = [3]
+        await ins
+        pd.testing.assert_frame_equal(
+            ins.outputs["df"].value,
+            expected[expected["A"] >= 90].reset_index(drop=True),
+        )
+
+        batches = list(
+            fnpd.iter_parquet_batches(
+                data, batch_size=20, columns=["A"], filters=[["A", "<", 45]]
+            )
+        )
+        self.assertTrue(all(0 < len(batch) <= 20 for batch in batches))
+        pd.testing.assert_frame_equal(
+            pd.concat(batches, ignore_index=True), df.loc[df["A"] < 45, ["A"]]
+        )
+
+        # filtered columns that are not read
+        batches = fnpd.iter_parquet_batches(
+            data, batch_size=20, columns=["B"], filters=[["C", "==", "y"]]
+        )
+        expected = df.loc[df["C"] == "y", ["B"]].reset_index(drop=True)
+        pd.testing.assert_frame_equal(pd.concat(batches, ignore_index=True), expected)
+        ins.inputs["columns"].value = ["B"]
+        ins.inputs["filters"].value = [["C", "==", "y"]]
+        for row_groups in ([0, 1, 2, 3], None):
+            ins.inputs["row_groups"].value = row_groups
+            await ins
+            pd.testing.assert_frame_equal(ins.outputs["df"].value, expected)
+
+        # the index is kept with and without row groups
+        toparquet.inputs["df"].value = df.set_index("A")
+        toparquet.inputs["with_index"].value = True
+        await toparquet
+        ins.inputs["data"].value = toparquet.outputs["parquet"].value
+        for row_groups in ([0, 1, 2, 3], None):
+            ins.inputs["row_groups"].value = row_groups
+            await ins
+            pd.testing.assert_frame_equal(
+                ins.outputs["df"].value,
+                df.set_index("A").loc[df["C"].values == "y", ["B"]],
+            )
+
+    @unittest.skipUnless(pa, "pyarrow not installed")
+    async def test_df_feather(self):
+        import tempfile
+        from pathlib import Path
+
+        df = pd.DataFrame(
+            {"A": np.arange(100), "B": np.arange(100) / 2, "C": ["x", "y"] * 50},
+            index=pd.Index([f"r{i}" for i in range(100)], name="row"),
+        )
+        tofeather = fnpd.df_to_feather()
+        tofeather.inputs["df"].value = df
+        tofeather.inputs["with_index"].value = True
+        await tofeather
+        data = tofeather.outputs["feather"].value
+
+        ins = fnpd.df_from_feather()
+        self.assertTrue(ins.inputs["copy"].value)
+        # the output still maps the file, which cannot be removed on windows
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory:
+            path = Path(directory) / "data.arrow"
+            path.write_bytes(data)
+            for source in [data, str(path)]:
+                ins.inputs["data"].value = source
+                self.assertEqual(
+                    ins.inputs["columns"].value_options["options"], ["A", "B", "C"]
+                )
+                ins.inputs["columns"].value = None
+                ins.inputs["copy"].value = False
+                await ins
+                pd.testing.assert_frame_equal(ins.outputs["df"].value, df)
+                # memory-mapped without a copy
+                self.assertFalse(ins.outputs["df"].value["A"].values.flags.writeable)
+
+                # writable by default
+                ins.inputs["columns"].value = ["A"]
+                ins.inputs["copy"].value = True
+                await ins
+                result = ins.outputs["df"].value
+                pd.testing.assert_frame_equal(result, df[["A"]])
+                result["A"] += 1
+                pd.testing.assert_series_equal(result["A"], df["A"] + 1)
+
+        table = pa.Table.from_pandas(df)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        ins.inputs["data"].value = sink.getvalue().to_pybytes()
+        ins.inputs["columns"].value = None
+        await ins
+        pd.testing.assert_frame_equal(ins.outputs["df"].value, df)
+
+        # a picked option is a single column name
+        named = pd.DataFrame({"ab": [1, 2], "a": [3, 4], "b": [5, 6]})
+        tofeather.inputs["df"].value = named
+        tofeather.inputs["with_index"].value = False
+        await tofeather
+        ins.inputs["data"].value = tofeather.outputs["feather"].value
+        ins.inputs["columns"].value = ins.inputs["columns"].value_options["options"][0]
+        await ins
+        pd.testing.assert_frame_equal(ins.outputs["df"].value, named[["ab"]])
+
+        ins.inputs["data"].value = str(Path(directory) / "missing.arrow")
+        with self.assertRaisesRegex(fn.NodeTriggerError, "No such file"):
+            await ins
+
     async def test_df_from_array(self):
         ins = fnpd.df_from_array()
         ins.inputs["data"].value = self.df.to_numpy()
@@ -146,6 +454,433 @@ class TestDataframeConvert(unittest.IsolatedAsyncioTestCase):
                 self.assertEqual(params["skiprows"], len(headerdata), params)
 
 
+class TestAutoreader(unittest.TestCase):
+    def setUp(self):
+        # auto_parse_table caches by default, the tests must not see each other's entries
+        fnpd.SNIFF_CACHE.clear()
+
+    def tearDown(self):
+        fnpd.SNIFF_CACHE.clear()
+
+    def test_score_table_info_matches_read_csv(self):
+        from io import StringIO
+        from funcnodes_pandas.dataframe._autoreader import (
+            score_table_info,
+            KIND_INT,
+            KIND_FLOAT,
+            KIND_OTHER,
+        )
+
+        lines = [
+            "1,2,3",
+            "1.5;2,5;abc",
+            "1 000\t2,5\t-3",
+            "1.234,5|7|nan",
+            '"a,b",1,"2"',
+            "1e5  -Infinity  NA",
+            "99999999999999999999,1",
+            "a\rb,1",
+            "",
+            " ",
+        ]
+        delimiters = [",", "\t", "  ", " ", ";", "|"]
+        decimals = [".", ","]
+        thousands = [None, ",", ".", " "]
+
+        scored = score_table_info(lines, delimiters, decimals, thousands)
+        for line, info in zip(lines, scored):
+            self.assertEqual(info["length"], len(line))
+            for delim in delimiters:
+                for dec in decimals:
+                    for thou in thousands:
+                        if len({delim, dec, thou}) < 3:
+                            continue
+                        key = (delim, dec, thou)
+                        try:
+                            df = pd.read_csv(
+                                StringIO(line),
+                                sep=delim,
+                                decimal=dec,
+                                thousands=thou,
+                                header=None,
+                                index_col=False,
+                                engine="python",
+                            )
+                        except Exception:
+                            self.assertNotIn(key, info, (line, key))
+                            continue
+                        expected = [
+                            KIND_INT
+                            if dt == np.dtype("int64")
+                            else KIND_FLOAT
+                            if dt == np.dtype("float64")
+                            else KIND_OTHER
+                            for dt in df.dtypes
+                        ]
+                        self.assertEqual(list(info[key]), expected, (line, key))
+
+    def test_score_table_info_pruning(self):
+        from funcnodes_pandas.dataframe._autoreader import (
+            score_table_info,
+            guess_best_table_params,
+        )
+
+        lines = ["name: test", "a;b;c"] + [f"{i};{i}.5;x{i}" for i in range(30)]
+        delimiters = [",", "\t", " ", ";", "|"]
+        decimals = [".", ","]
+        thousands = [None, ".", " "]
+
+        full = score_table_info(lines, delimiters, decimals, thousands)
+        pruned = score_table_info(
+            lines, delimiters, decimals, thousands, cutoff_ratio=0.5
+        )
+        pruned_keys = {k for info in pruned for k in info if k != "length"}
+        full_keys = {k for info in full for k in info if k != "length"}
+        self.assertTrue(pruned_keys < full_keys)
+        self.assertEqual({k[0] for k in pruned_keys}, {";"})
+        self.assertEqual(
+            guess_best_table_params(full, lines, 0.5),
+            guess_best_table_params(pruned, lines, 0.5),
+        )
+
+    def test_score_table_info_parallel(self):
+        from funcnodes_pandas.dataframe._autoreader import (
+            get_process_pool,
+            score_table_info,
+        )
+
+        lines = ["a;b;c"] + [f"{i};{i},5;1.000,{i}" for i in range(50)]
+        args = ([",", ";", " "], [".", ","], [None, ".", " "])
+        serial = score_table_info(lines, *args)
+        # pools are kept per worker count, requesting another count keeps this one
+        pool = get_process_pool(2)
+        self.assertIsNot(get_process_pool(3), pool)
+        self.assertIs(get_process_pool(2), pool)
+        parallel = score_table_info(lines, *args, workers=2)
+        self.assertEqual(len(serial), len(parallel))
+        for s_info, p_info in zip(serial, parallel):
+            self.assertEqual(list(s_info), list(p_info))
+            for key in s_info:
+                if key != "length":
+                    np.testing.assert_array_equal(s_info[key], p_info[key])
+
+    def test_sniff_cache(self):
+        import tempfile
+        from unittest import mock
+        from funcnodes_pandas.dataframe import _autoreader
+
+        def make_csv(offset):
+            rows = "\n".join(f"{i + offset};{i + offset},5" for i in range(20))
+            return "device: A\nx;y\n" + rows
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = fnpd.SniffCache(directory=directory)
+            with mock.patch.object(_autoreader, "SNIFF_CACHE", cache):
+                df, params = _autoreader.auto_parse_table(make_csv(0))
+                self.assertEqual(cache.stats()["misses"], 1)
+
+                # same format with other values skips the sniffing
+                with mock.patch.object(
+                    _autoreader, "score_table_info", side_effect=AssertionError
+                ):
+                    df2, params2 = _autoreader.auto_parse_table(make_csv(100))
+                self.assertEqual(params2, params)
+                self.assertEqual(df2["x"].iloc[0], 100)
+                self.assertEqual(cache.stats()["hits"], 1)
+
+                # a new cache on the same directory reads the stored entry
+                cache.clear()
+                with mock.patch.object(
+                    _autoreader, "score_table_info", side_effect=AssertionError
+                ):
+                    _, params3 = _autoreader.auto_parse_table(make_csv(7))
+                self.assertEqual(params3, params)
+
+                # other candidates are another key
+                _autoreader.auto_parse_table(
+                    make_csv(0), possible_delimiters=[";", ","]
+                )
+                self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_sniff_cache_all_lines(self):
+        from unittest import mock
+        from funcnodes_pandas.dataframe import _autoreader
+
+        def metadata_csv(lines):
+            header = "".join(f"info {i}: value\n" for i in range(lines))
+            return header + "x;y\n" + "\n".join(f"{i};{i},5" for i in range(300))
+
+        def thousands_csv(start):
+            rows = [f'{i};"{i}.5"' for i in range(start)]
+            rows += [f'{i};"1,{i:03d}.5"' for i in range(start, 300)]
+            return "x;y\n" + "\n".join(rows)
+
+        cache = fnpd.SniffCache()
+        with mock.patch.object(_autoreader, "SNIFF_CACHE", cache):
+            _autoreader.auto_parse_table(metadata_csv(40))
+            df, params = _autoreader.auto_parse_table(metadata_csv(35))
+            self.assertEqual(params["skiprows"], 35)
+            self.assertEqual(list(df.columns), ["x", "y"])
+
+            _autoreader.auto_parse_table(thousands_csv(60))
+            df, params = _autoreader.auto_parse_table(thousands_csv(40))
+            self.assertEqual(params["thousands"], ",")
+            self.assertEqual(df["y"].dtype, np.float64)
+        self.assertEqual(cache.stats()["hits"], 0)
+
+    def test_iter_parse_table(self):
+        from io import BytesIO
+        from funcnodes_pandas.dataframe._autoreader import auto_parse_table
+
+        df = pd.DataFrame(
+            {
+                "a": np.arange(1000),
+                "b": np.linspace(0, 1, 1000),
+                "c": ["\u00e4", "b"] * 500,
+            }
+        )
+        text = "\n  device: A\n" + df.to_csv(index=False, sep=";", decimal=",")
+        for encoding in ["utf-8", "utf-16"]:
+            data = text.encode(encoding)
+            expected, expected_params = auto_parse_table(data, use_cache=False)
+            chunks, params = fnpd.iter_parse_table(
+                BytesIO(data), chunksize=300, head_bytes=2048, use_cache=False
+            )
+            self.assertEqual(params, expected_params)
+            chunks = list(chunks)
+            self.assertEqual([len(c) for c in chunks], [300, 300, 300, 100])
+            pd.testing.assert_frame_equal(
+                pd.concat(chunks, ignore_index=True), expected
+            )
+            pd.testing.assert_frame_equal(expected, df)
+
+    def test_auto_parse_table_infer_dtypes(self):
+        from funcnodes_pandas.dataframe._autoreader import auto_parse_table
+
+        n = 1000
+        df = pd.DataFrame(
+            {
+                "small": np.arange(n) % 100,
+                # exceeds int8 only after the sampled rows
+                "large": np.r_[np.arange(n - 1) % 100, 100_000],
+                "quarter": (np.arange(n) % 8) / 4,
+                "fine": np.arange(n) / 3,
+                "label": ["a", "b"] * (n // 2),
+                "id": [f"id{i}" for i in range(n)],
+            }
+        )
+        text = df.to_csv(index=False)
+        for max_lines in [200, 2000]:
+            parsed, params = auto_parse_table(
+                text, max_lines=max_lines, infer_dtypes=True, use_cache=False
+            )
+            self.assertEqual(
+                params["dtype"],
+                {
+                    "small": "int8",
+                    "large": "int32",
+                    "quarter": "float32",
+                    "label": "category",
+                },
+            )
+            self.assertEqual(parsed["large"].tolist(), df["large"].tolist())
+            self.assertEqual(parsed["fine"].dtype, np.float64)
+            self.assertEqual(parsed["id"].dtype, object)
+            pd.testing.assert_frame_equal(
+                parsed, df, check_dtype=False, check_categorical=False
+            )
+
+        _, params = auto_parse_table(text, use_cache=False)
+        self.assertNotIn("dtype", params)
+
+    def test_auto_parse_table_engine(self):
+        from funcnodes_pandas.dataframe._autoreader import auto_parse_table
+
+        df = pd.DataFrame(
+            {
+                "a": np.arange(300),
+                "b": np.arange(300) / 4,
+                "c": ["\u00e4", "b", "c"] * 100,
+            }
+        )
+        texts = [
+            "\n  device: A\n" + df.to_csv(index=False, sep=";", decimal=",") + "  \n",
+            # regex separator, read by the python engine
+            "x  y\n" + "\n".join(f"{i}  {i / 2}" for i in range(50)),
+            # thousands separator, not supported by pyarrow
+            "x;y\n" + "\n".join(f"{i}.000;{i},5" for i in range(1, 50)),
+        ]
+        for text in texts:
+            for encoding in ["utf-8", "utf-8-sig", "latin-1", "utf-16"]:
+                data = text.encode(encoding)
+                expected, expected_params = auto_parse_table(data, use_cache=False)
+                for engine in ["c", "pyarrow"]:
+                    parsed, params = auto_parse_table(
+                        data, engine=engine, use_cache=False
+                    )
+                    self.assertEqual(params, expected_params)
+                    pd.testing.assert_frame_equal(parsed, expected)
+
+    def test_auto_parse_table_path(self):
+        import tempfile
+        from io import BytesIO
+        from pathlib import Path
+        from funcnodes_pandas.dataframe._autoreader import (
+            auto_parse_table,
+            iter_parse_table,
+        )
+
+        df = pd.DataFrame(
+            {"a": np.arange(300), "b": np.arange(300) / 4, "c": ["\u00e4", "b"] * 150}
+        )
+        text = "\n  device: A\n" + df.to_csv(index=False, sep=";", decimal=",") + "\n"
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "data.csv"
+            for encoding in ["utf-8", "utf-8-sig", "latin-1", "utf-16"]:
+                data = text.encode(encoding)
+                path.write_bytes(data)
+                for engine in [None, "pyarrow"]:
+                    expected, expected_params = auto_parse_table(
+                        data, engine=engine, use_cache=False
+                    )
+                    with open(path, "rb") as handle:
+                        sources = [path, handle, BytesIO(data)]
+                        for source in sources:
+                            parsed, params = auto_parse_table(
+                                source, engine=engine, use_cache=False
+                            )
+                            self.assertEqual(params, expected_params)
+                            pd.testing.assert_frame_equal(parsed, expected)
+
+                chunks, params = iter_parse_table(path, chunksize=100)
+                self.assertEqual(params["sep"], ";")
+                pd.testing.assert_frame_equal(
+                    pd.concat(list(chunks), ignore_index=True), expected
+                )
+
+            with self.assertRaises(FileNotFoundError):
+                auto_parse_table(Path(directory) / "missing.csv")
+
+    def test_auto_parse_table_corpus(self):
+        from autoreader_corpus import generate_corpus, parameter_errors
+        from funcnodes_pandas.dataframe._autoreader import auto_parse_table
+
+        for case in generate_corpus(mixed=0):
+            with self.subTest(case.name):
+                df, params = auto_parse_table(case.data(), use_cache=False)
+                errors = parameter_errors(case, df, params)
+                if case.encoding == "latin-1":
+                    # chardet takes the few latin-1 umlauts for windows-1251
+                    errors = [
+                        error
+                        for error in errors
+                        if not error.startswith("encoding") and error != "values differ"
+                    ]
+                self.assertEqual(errors, [])
+
+    def test_auto_parse_table_compressed(self):
+        import bz2
+        import gzip
+        import lzma
+        import zipfile
+        from io import BytesIO
+        from funcnodes_pandas.dataframe._autoreader import (
+            auto_parse_table,
+            iter_parse_table,
+            zstandard,
+        )
+
+        def zip_compress(data):
+            archive = BytesIO()
+            with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as f:
+                f.writestr("data.csv", data)
+            return archive.getvalue()
+
+        compressions = {
+            "gzip": gzip.compress,
+            "bz2": bz2.compress,
+            "xz": lzma.compress,
+            "zip": zip_compress,
+        }
+        if zstandard is not None:
+            compressions["zstd"] = zstandard.ZstdCompressor().compress
+
+        df = pd.DataFrame(
+            {
+                "a": np.arange(3000),
+                "b": np.arange(3000) / 4,
+                "c": ["\u00e4", "b"] * 1500,
+            }
+        )
+        text = "\n  device: A\n" + df.to_csv(index=False, sep=";", decimal=",")
+        for encoding in ["utf-8", "utf-16"]:
+            data = text.encode(encoding)
+            for compression, compress in compressions.items():
+                with self.subTest(compression=compression, encoding=encoding):
+                    compressed = compress(data)
+                    for engine in [None, "pyarrow"]:
+                        expected, expected_params = auto_parse_table(
+                            data, engine=engine, infer_dtypes=True, use_cache=False
+                        )
+                        parsed, params = auto_parse_table(
+                            compressed,
+                            engine=engine,
+                            infer_dtypes=True,
+                            use_cache=False,
+                        )
+                        self.assertEqual(params, expected_params)
+                        pd.testing.assert_frame_equal(parsed, expected)
+
+                    chunks, params = iter_parse_table(compressed, chunksize=1000)
+                    self.assertEqual(params["sep"], ";")
+                    pd.testing.assert_frame_equal(
+                        pd.concat(list(chunks), ignore_index=True),
+                        auto_parse_table(data, use_cache=False)[0],
+                    )
+
+    def test_detect_encoding_bom(self):
+        from funcnodes_pandas.dataframe._autoreader import detect_encoding_info
+
+        text = "a;b\n1;2\n"
+        for encoding, expected in [
+            ("utf-8-sig", "utf-8-sig"),
+            ("utf-16", "utf-16"),
+            ("utf-32", "utf-32"),
+        ]:
+            info = detect_encoding_info(text.encode(encoding))
+            self.assertEqual(info["encoding"], expected)
+            self.assertEqual(info["confidence"], 1.0)
+            self.assertEqual(text.encode(encoding).decode(info["encoding"]), text)
+
+    def test_detect_encoding_budget(self):
+        from funcnodes_pandas.dataframe._autoreader import (
+            detect_encoding_info,
+            decode_bytes,
+        )
+
+        data = b"a,b\n1,2\n" * 10_000 + "\u00e4\u00f6\u00fc,1\n".encode("utf-8")
+        info = detect_encoding_info(data, chunk_size=1024, max_bytes=4096)
+        self.assertLessEqual(info["bytes"], 4096)
+        self.assertFalse(info["complete"])
+        # an ascii sample of a larger input is promoted to utf-8
+        self.assertEqual(info["encoding"], "utf-8")
+
+        full = detect_encoding_info(data[:20])
+        self.assertTrue(full["complete"])
+        self.assertEqual(full["encoding"], "ascii")
+
+        text, info = decode_bytes(data, max_bytes=4096)
+        self.assertEqual(text, data.decode("utf-8"))
+
+    def test_auto_parse_table_encoding_confidence(self):
+        from funcnodes_pandas.dataframe._autoreader import auto_parse_table
+
+        df, params = auto_parse_table("x;y\n\u00e4;1,5\n\u00fc;2,5\n".encode("utf-8"))
+        self.assertEqual(params["encoding"], "utf-8")
+        self.assertGreater(params["encoding_confidence"], 0.5)
+        self.assertEqual(df["x"].tolist(), ["\u00e4", "\u00fc"])
+
+
 class TestDataframeManipulation(unittest.IsolatedAsyncioTestCase):
     def setUp(self) -> None:
         testing.setup()
@@ -0,0 +1,431 @@
+import unittest
+import base64
+import funcnodes_pandas as fnpd
+import pandas as pd
+import funcnodes as fn
+import numpy as np
+from funcnodes_pandas.encoding import pa
+
+
+class TestDataFrameEncoding(unittest.TestCase):
+    def setUp(self) -> None:
+        self.df = pd.DataFrame(
+            data={
+                "A": [1, 2, 3, 4, 5, 6],
+                "B": [4.0, 5.5, 6.25, np.nan, 8.0, 9.0],
+                "C": ["a", "b", "c", "d", "e", "f"],
+            }
+        )
+
+    def test_default_split(self):
+        enc = fn.JSONEncoder.apply_custom_encoding(self.df)
+        self.assertEqual(enc["columns"], ["A", "B", "C"])
+        self.assertEqual(enc["index"], list(range(6)))
+        self.assertEqual(enc["data"][3], [4, None, "d"])
+
+    def test_default_split_preview(self):
+        enc = fn.JSONEncoder.apply_custom_encoding(self.df, preview=True)
+        self.assertEqual(len(enc["data"]), 5)
+        self.assertEqual(enc["total_rows"], 6)
+        self.assertEqual(enc["total_columns"], 3)
+
+    def test_window(self):
+        enc = fnpd.encode_window(self.df, offset=2, limit=2, columns=["C", "A"])
+        self.assertEqual(enc["index"], [2, 3])
+        self.assertEqual(enc["columns"], ["C", "A"])
+        self.assertEqual(enc["data"], [["c", 3], ["d", 4]])
+        self.assertEqual(enc["offset"], 2)
+        self.assertEqual(enc["total_rows"], 6)
+
+        # windows past the end are empty
+        enc = fnpd.encode_window(self.df, offset=10, limit=2)
+        self.assertEqual(enc["data"], [])
+
+    def test_window_max_rows(self):
+        with fnpd.encoding_options("table", max_window_rows=3):
+            enc = fnpd.encode_window(self.df, offset=1, limit=100)
+        self.assertEqual(enc["index"], [1, 2, 3])
+        # a window without a limit is bounded as well
+        with fnpd.encoding_options(
+            "table", max_window_rows=3, window={"offset": 1, "limit": None}
+        ):
+            enc = fn.JSONEncoder.apply_custom_encoding(self.df)
+        self.assertEqual(enc["index"], [1, 2, 3])
+
+    def test_io_value(self):
+        node = fnpd.to_csv_str()
+        node.inputs["df"].value = self.df
+        enc = fnpd.encode_io_value(node, "df", window={"offset": 4, "limit": 10})
+        self.assertEqual(enc["index"], [4, 5])
+        self.assertEqual(enc["total_rows"], 6)
+        # the options only apply to the request
+        enc = fnpd.encode_io_value(node, "df", preview=True)
+        self.assertEqual(len(enc["data"]), 5)
+        self.assertIsNone(fnpd.get_encoding_options("table")["window"])
+
+    @unittest.skipUnless(pa, "pyarrow not installed")
+    def test_arrow(self):
+        with fnpd.encoding_options("table", format="arrow"):
+            enc = fn.JSONEncoder.apply_custom_encoding(self.df)
+        self.assertEqual(enc["format"], "arrow")
+        self.assertIsInstance(enc["data"], str)
+        pd.testing.assert_frame_equal(
+            fnpd.arrow_ipc_to_df(base64.b64decode(enc["data"])), self.df
+        )
+
+        # options are reset after leaving the context
+        self.assertEqual(fnpd.get_encoding_options("table")["format"], "split")
+
+    def test_arrow_fallback(self):
+        df = pd.DataFrame({"A": [1, "a", 2.5]})
+        with fnpd.encoding_options("table", format="arrow"):
+            enc = fn.JSONEncoder.apply_custom_encoding(df)
+        self.assertEqual(enc, df.to_dict(orient="split"))
+
+    def test_iter_encode(self):
+        chunks = list(fnpd.iter_encode_dataframe(self.df, chunksize=4))
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual([c["offset"] for c in chunks], [0, 4])
+        self.assertEqual([c["last"] for c in chunks], [False, True])
+        self.assertEqual(chunks[1]["total_rows"], 6)
+        full = fn.JSONEncoder.apply_custom_encoding(self.df)
+        self.assertEqual(chunks[0]["data"] + chunks[1]["data"], full["data"])
+        self.assertEqual(chunks[0]["index"] + chunks[1]["index"], full["index"])
+
+        # an empty frame still yields its columns
+        chunks = list(fnpd.iter_encode_dataframe(self.df.iloc[:0]))
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0]["columns"], ["A", "B", "C"])
+        self.assertTrue(chunks[0]["last"])
+
+    @unittest.skipUnless(pa, "pyarrow not installed")
+    def test_iter_encode_arrow(self):
+        with fnpd.encoding_options("table", format="arrow"):
+            chunks = list(fnpd.iter_encode_dataframe(self.df, chunksize=4))
+        df = pd.concat(
+            [fnpd.arrow_ipc_to_df(base64.b64decode(c["data"])) for c in chunks]
+        )
+        pd.testing.assert_frame_equal(df, self.df)
+
+    def test_stats_preview(self):
+        with fnpd.encoding_options("table", preview="stats", histogram_bins=4):
+            enc = fn.JSONEncoder.apply_custom_encoding(self.df, preview=True)
+            full = fn.JSONEncoder.apply_custom_encoding(self.df)
+        self.assertEqual(len(full["data"]), 6)
+        self.assertEqual(enc["format"], "stats")
+        self.assertEqual(enc["total_rows"], 6)
+        stats = {s["column"]: s for s in enc["stats"]}
+        self.assertEqual(stats["A"]["dtype"], "int64")
+        self.assertEqual(stats["A"]["min"], 1)
+        self.assertEqual(stats["A"]["max"], 6)
+        self.assertEqual(stats["A"]["mean"], 3.5)
+        self.assertEqual(stats["A"]["distinct"], 6)
+        self.assertEqual(sum(stats["A"]["histogram"]["counts"]), 6)
+        self.assertEqual(len(stats["A"]["histogram"]["edges"]), 5)
+        self.assertEqual(stats["B"]["nulls"], 1)
+        self.assertEqual(sum(stats["B"]["histogram"]["counts"]), 5)
+        self.assertIsNone(stats["C"]["mean"])
+        self.assertIsNone(stats["C"]["histogram"])
+
+        # all missing columns have no min, max or mean
+        df = pd.DataFrame(
+            {
+                "D": pd.to_datetime([None, None]),
+                "E": [np.nan, np.nan],
+                "F": pd.array([None, None], dtype="Int64"),
+            }
+        )
+        stats = fnpd.encoding.df_summary_stats(df)
+        for colstats in stats:
+            self.assertEqual(colstats["nulls"], 2)
+            for key in ("min", "max", "mean"):
+                self.assertIsNone(colstats[key])
+
+        # duplicated column labels
+        df = pd.DataFrame([[1, 2.0, "a"]], columns=["x", "x", "x"])
+        with fnpd.encoding_options("table", preview="stats"):
+            enc = fn.JSONEncoder.apply_custom_encoding(df, preview=True)
+        self.assertEqual([s["column"] for s in enc["stats"]], ["x", "x", "x"])
+        self.assertEqual([s["min"] for s in enc["stats"]], [1, 2.0, None])
+        self.assertEqual(sum(enc["stats"][1]["histogram"]["counts"]), 1)
+
+    def test_distinct_estimate(self):
+        ser = pd.Series(np.arange(200_000) % 5_000)
+        estimate = fnpd.encoding.estimate_distinct(ser)
+        self.assertLess(abs(estimate - 5_000), 500)
+
+    def test_columnar(self):
+        df = self.df.assign(
+            D=pd.date_range("2020-01-01", periods=6, tz="UTC"),
+            E=[True, False] * 3,
+        )
+        with fnpd.encoding_options("table", format="columnar"):
+            enc = fn.JSONEncoder.apply_custom_encoding(df)
+        self.assertEqual(enc["format"], "columnar")
+        self.assertEqual(enc["columns"], ["A", "B", "C", "D", "E"])
+        self.assertEqual(
+            enc["index"], {"dtype": "range", "start": 0, "stop": 6, "step": 1}
+        )
+        cols = enc["data"]
+        self.assertEqual(cols[0]["dtype"], "<i8")
+        np.testing.assert_array_equal(
+            np.frombuffer(base64.b64decode(cols[0]["data"]), dtype="<i8"), df["A"]
+        )
+        np.testing.assert_array_equal(
+            np.frombuffer(base64.b64decode(cols[1]["data"]), dtype=cols[1]["dtype"]),
+            df["B"],
+        )
+        self.assertEqual(cols[2], {"dtype": "object", "data": list("abcdef")})
+        self.assertEqual(cols[3]["dtype"], "<M8[ns]")
+        self.assertEqual(cols[3]["tz"], "UTC")
+        self.assertEqual(cols[4]["dtype"], "|b1")
+
+    def test_columnar_dictionary(self):
+        df = pd.DataFrame(
+            {
+                "status": ["ok", "warn", None, "ok"] * 10,
+                "unit": pd.Categorical(["mV", "A"] * 20),
+            }
+        )
+        with fnpd.encoding_options("table", format="columnar"):
+            enc = fn.JSONEncoder.apply_custom_encoding(df)
+        status, unit = enc["data"]
+        self.assertEqual(status["dtype"], "category")
+        self.assertEqual(status["categories"]["data"], ["ok", "warn"])
+        self.assertEqual(status["codes"]["dtype"], "|i1")
+        codes = np.frombuffer(base64.b64decode(status["codes"]["data"]), dtype="|i1")
+        self.assertEqual(codes[:4].tolist(), [0, 1, -1, 0])
+        self.assertEqual(unit["categories"]["data"], ["A", "mV"])
+        self.assertFalse(unit["ordered"])
+
+        with fnpd.encoding_options(
+            "table", format="columnar", dictionary_threshold=None
+        ):
+            enc = fn.JSONEncoder.apply_custom_encoding(df)
+        self.assertEqual(enc["data"][0]["data"][:4], ["ok", "warn", None, "ok"])
+
+        # high cardinality columns stay lists
+        with fnpd.encoding_options("table", format="columnar", dictionary_threshold=1):
+            enc = fn.JSONEncoder.apply_custom_encoding(df)
+        self.assertEqual(enc["data"][0]["dtype"], "object")
+        self.assertEqual(enc["data"][1]["dtype"], "category")
+
+    def test_columnar_series(self):
+        ser = pd.Series([1.5, 2.5], index=["a", "b"], name="x")
+        with fnpd.encoding_options("list", format="columnar"):
+            enc = fn.JSONEncoder.apply_custom_encoding(ser)
+        self.assertEqual(enc["name"], "x")
+        self.assertEqual(enc["index"], {"dtype": "object", "data": ["a", "b"]})
+        np.testing.assert_array_equal(
+            np.frombuffer(base64.b64decode(enc["values"]["data"]), dtype="<f8"), ser
+        )
+
+    def test_precision_and_epoch(self):
+        df = pd.DataFrame(
+            {
+                "t": pd.to_datetime(["2020-01-01", None]),
+                "f": [1 / 3, 123456.789],
+            }
+        )
+        with fnpd.encoding_options("table", significant_digits=3, datetime_unit="s"):
+            enc = fn.JSONEncoder.apply_custom_encoding(df)
+        self.assertEqual(enc["data"], [[1577836800, 0.333], [None, 123000.0]])
+        self.assertEqual(enc["epoch_columns"], [0])
+        self.assertEqual(enc["datetime_unit"], "s")
+        # the original frame is not modified
+        self.assertEqual(df["f"].iloc[0], 1 / 3)
+
+        with fnpd.encoding_options(
+            "table", format="columnar", float32=True, datetime_unit="ms"
+        ):
+            enc = fn.JSONEncoder.apply_custom_encoding(df)
+        t, f = enc["data"]
+        self.assertEqual(t["dtype"], "<i8")
+        self.assertEqual(
+            np.frombuffer(base64.b64decode(t["data"]), dtype="<i8")[0],
+            1577836800000,
+        )
+        self.assertEqual(f["dtype"], "<f4")
+
+        with fnpd.encoding_options("table", float32=True):
+            enc = fn.JSONEncoder.apply_custom_encoding(df)
+        self.assertEqual(enc["data"][0][1], 0.3333333)
+
+    def test_sanitize(self):
+        df = pd.DataFrame(
+            {
+                "t": pd.to_datetime(["2020-01-01", None, "2020-01-02"]),
+                "f": [0.5, np.inf, np.nan],
+                "i": [1, 2, 3],
+            }
+        )
+
+        def bitmap(b64):
+            return np.unpackbits(
+                np.frombuffer(base64.b64decode(b64), dtype=np.uint8),
+                bitorder="little",
+            )[:3].tolist()
+
+        with fnpd.encoding_options("table", sanitize=True):
+            enc = fn.JSONEncoder.apply_custom_encoding(df)
+        self.assertEqual(enc["data"][1], [None, None, 2])
+        self.assertEqual(enc["data"][2][1:], [None, 3])
+        self.assertEqual(bitmap(enc["nulls"][0]), [0, 1, 0])
+        self.assertEqual(bitmap(enc["nulls"][1]), [0, 0, 1])
+        self.assertIsNone(enc["nulls"][2])
+        self.assertEqual(bitmap(enc["posinf"][1]), [0, 1, 0])
+        self.assertNotIn("neginf", enc)
+
+        with fnpd.encoding_options("table", format="columnar", sanitize=True):
+            enc = fn.JSONEncoder.apply_custom_encoding(df)
+        self.assertEqual(
+            np.frombuffer(base64.b64decode(enc["data"][1]["data"]), "<f8").tolist(),
+            [0.5, 0.0, 0.0],
+        )
+        self.assertEqual(bitmap(enc["nulls"][1]), [0, 0, 1])
+
+
+class TestEncodingCache(unittest.TestCase):
+    def setUp(self) -> None:
+        fnpd.ENCODING_CACHE.clear()
+        self.df = pd.DataFrame({"A": np.arange(1000), "B": np.random.rand(1000)})
+
+    def tearDown(self):
+        fnpd.ENCODING_CACHE.clear()
+
+    def test_hits(self):
+        first = fn.JSONEncoder.apply_custom_encoding(self.df)
+        second = fn.JSONEncoder.apply_custom_encoding(self.df)
+        self.assertIs(first, second)
+        stats = fnpd.encoding_cache_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertGreater(stats["nbytes"], 0)
+
+        # preview and other options are cached separately
+        fn.JSONEncoder.apply_custom_encoding(self.df, preview=True)
+        fnpd.encode_window(self.df, offset=10, limit=10)
+        self.assertEqual(fnpd.encoding_cache_stats()["misses"], 3)
+
+    def test_changed_content(self):
+        first = fn.JSONEncoder.apply_custom_encoding(self.df)
+        # a single edited cell in any row
+        self.df.iloc[1, 1] = -1.0
+        second = fn.JSONEncoder.apply_custom_encoding(self.df)
+        self.assertEqual(second["data"][1][1], -1.0)
+        self.assertNotEqual(first, second)
+        self.assertEqual(fnpd.encoding_cache_stats()["hits"], 0)
+
+    def test_disabled(self):
+        with fnpd.encoding_options("table", cache=False):
+            fn.JSONEncoder.apply_custom_encoding(self.df)
+            fn.JSONEncoder.apply_custom_encoding(self.df)
+        self.assertEqual(fnpd.encoding_cache_stats()["entries"], 0)
+
+    def test_eviction(self):
+        cache = fnpd.encoding.EncodingCache(max_bytes=100)
+        objs = [pd.DataFrame({"A": [i]}) for i in range(3)]
+        for i, obj in enumerate(objs):
+            cache.put(i, obj, i, 40)
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertEqual(cache.get(0, objs[0]), (None, False))
+        self.assertEqual(cache.get(2, objs[2]), (2, True))
+        # entries of other objects with the same key are not returned
+        self.assertEqual(cache.get(2, objs[1]), (None, False))
+
+    def test_collected(self):
+        import gc
+
+        fn.JSONEncoder.apply_custom_encoding(self.df)
+        self.assertEqual(fnpd.encoding_cache_stats()["entries"], 1)
+        del self.df
+        gc.collect()
+        stats = fnpd.encoding_cache_stats()
+        self.assertEqual(stats["entries"], 0)
+        self.assertEqual(stats["nbytes"], 0)
+
+        # collected while the cache is locked, removed by the next operation
+        cache = fnpd.encoding.EncodingCache()
+        obj = pd.DataFrame({"A": [1]})
+        cache.put(0, obj, 0, 10)
+        with cache._lock:
+            del obj
+            gc.collect()
+        stats = cache.stats()
+        self.assertEqual((stats["entries"], stats["nbytes"]), (0, 0))
+
+    def test_estimate_nbytes(self):
+        import json
+
+        for options in [{}, {"format": "columnar"}, {"preview": "stats"}]:
+            with fnpd.encoding_options("table", cache=False, **options):
+                data = fn.JSONEncoder.apply_custom_encoding(self.df, preview=True)
+            size = len(json.dumps(data))
+            estimate = fnpd.encoding.estimate_nbytes(data)
+            self.assertLess(abs(estimate - size), size * 0.25)
+
+
+class TestSeriesEncoding(unittest.TestCase):
+    def test_default(self):
+        ser = pd.Series([1, 2, 3])
+        enc = fn.JSONEncoder.apply_custom_encoding(ser)
+        self.assertEqual(enc, [1, 2, 3])
+
+    def test_decimate_lttb(self):
+        ser = pd.Series(
+            np.sin(np.linspace(0, 20, 10_000)),
+            index=pd.date_range("2020-01-01", periods=10_000, freq="s"),
+        )
+        with fnpd.encoding_options("list", decimate="lttb", max_points=100):
+            enc = fnpd.encode_pdDf(ser).data
+        self.assertEqual(enc["length"], 10_000)
+        self.assertEqual(len(enc["values"]), 100)
+        self.assertEqual(len(enc["index"]), 100)
+        self.assertEqual(enc["index"][0], str(ser.index[0]))
+        self.assertEqual(enc["index"][-1], str(ser.index[-1]))
+        np.testing.assert_array_equal(
+            enc["values"], ser[pd.to_datetime(enc["index"])].values
+        )
+
+    def test_decimate_preview(self):
+        ser = pd.Series(np.sin(np.linspace(0, 20, 100_000)))
+        with fnpd.encoding_options("list", decimate="lttb", max_points=500):
+            enc = fnpd.encode_pdDf(ser, preview=True).data
+            full = fnpd.encode_pdDf(ser).data
+        self.assertEqual(enc["length"], 100_000)
+        self.assertEqual(len(enc["index"]), 500)
+        self.assertEqual(len(enc["values"]), 500)
+        self.assertEqual(enc["values"], full["values"])
+
+    def test_columnar_preview(self):
+        ser = pd.Series(np.random.rand(10_000))
+        with fnpd.encoding_options("list", format="columnar"):
+            enc = fnpd.encode_pdDf(ser, preview=True).data
+        self.assertEqual(enc["length"], 10_000)
+        values = np.frombuffer(
+            base64.b64decode(enc["values"]["data"]), dtype=enc["values"]["dtype"]
+        )
+        np.testing.assert_array_equal(values, ser.values[:5])
+        with fnpd.encoding_options(
+            "list", format="columnar", decimate="lttb", max_points=500
+        ):
+            enc = fnpd.encode_pdDf(ser, preview=True).data
+        values = np.frombuffer(
+            base64.b64decode(enc["values"]["data"]), dtype=enc["values"]["dtype"]
+        )
+        self.assertEqual(len(values), 500)
+
+    def test_decimate_minmax(self):
+        ser = pd.Series(np.random.rand(10_001))
+        ser.iloc[1234] = 5
+        ser.iloc[4321] = -5
+        with fnpd.encoding_options("list", decimate="minmax", max_points=100):
+            enc = fnpd.encode_pdDf(ser).data
+        self.assertLessEqual(len(enc["values"]), 100)
+        self.assertIn(1234, enc["index"])
+        self.assertIn(4321, enc["index"])
+
+    def test_decimate_small_or_non_numeric(self):
+        with fnpd.encoding_options("list", decimate="lttb", max_points=3):
+            enc = fn.JSONEncoder.apply_custom_encoding(pd.Series(["a", "b", "c", "d"]))
+        self.assertEqual(enc, ["a", "b", "c", "d"])